@@ -18,35 +18,111 @@ import time
 from typing import Optional
 
 import httpx
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Claude Agent API", version="1.0.0")
+app = FastAPI(
+    title="Claude Agent API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+
+# Session ID is fixed for the lifetime of the container
+SESSION_ID = os.environ.get("SESSION_ID", "unknown")
 
 # Dev server URL for proxying (internal only)
 DEV_SERVER_URL = "http://localhost:3001"
 
-# HTTP client for proxying
-_http_client: Optional[httpx.AsyncClient] = None
+# Headers dropped when proxying (raw, lowercase header names). A request
+# body is streamed through, so content-length is kept and httpx only falls
+# back to chunked encoding when the client sent none; without a body it is
+# dropped too so upstream never expects bytes that will not come
+_REQ_DROP = frozenset({b"host", b"transfer-encoding"})
+_REQ_DROP_NO_BODY = _REQ_DROP | {b"content-length"}
+_RESP_DROP = frozenset({b"transfer-encoding", b"content-length"})
+
+# After a failed connect, answer proxy requests locally for this long
+# instead of retrying a dev server that is still starting
+CONNECT_ERROR_BACKOFF = 1.0
+_last_connect_err_ts = 0.0
+
+# Connection pool for proxying - sized so bursts of UAT traffic reuse
+# keep-alive connections instead of reconnecting to the dev server
+PROXY_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=60,
+)
+
+
+@app.on_event("startup")
+async def open_http_client() -> None:
+    """Create the shared HTTP client used for proxying."""
+    app.state.http_client = httpx.AsyncClient(
+        base_url=DEV_SERVER_URL,
+        limits=PROXY_LIMITS,
+        timeout=30.0,
+    )
+
+
+@app.on_event("shutdown")
+async def close_http_client() -> None:
+    """Stop the queue monitor and close the shared HTTP client."""
+    monitor = getattr(app.state, "queue_monitor", None)
+    if monitor is not None:
+        monitor.cancel()
+        try:
+            await monitor
+        except asyncio.CancelledError:
+            pass
+
+    client = getattr(app.state, "http_client", None)
+    if client is not None:
+        await client.aclose()
 
 
 def get_http_client() -> httpx.AsyncClient:
-    """Get or create async HTTP client for proxying."""
-    global _http_client
-    if _http_client is None:
-        _http_client = httpx.AsyncClient(timeout=30.0)
-    return _http_client
+    """Get the shared async HTTP client for proxying."""
+    return app.state.http_client
+
+# Prompt queue (shared with main.py) - bounded so a flood of prompts
+# gets back-pressure instead of growing memory without limit
+PROMPT_QUEUE_MAX = int(os.environ.get("PROMPT_QUEUE_MAX", "256"))
+prompt_queue: asyncio.Queue = asyncio.Queue(maxsize=PROMPT_QUEUE_MAX)
+
+# Interval for logging queue depth (helps spot a stalled consumer)
+QUEUE_MONITOR_INTERVAL = 10.0
+
+
+async def _monitor_queue() -> None:
+    """Periodically log prompt queue depth."""
+    while True:
+        await asyncio.sleep(QUEUE_MONITOR_INTERVAL)
+        queue_size = prompt_queue.qsize()
+        if queue_size:
+            logger.info(f"Prompt queue size: {queue_size}/{PROMPT_QUEUE_MAX}")
+
+
+@app.on_event("startup")
+async def start_queue_monitor() -> None:
+    """Start the background queue depth monitor."""
+    app.state.queue_monitor = asyncio.create_task(_monitor_queue())
 
-# Prompt queue (shared with main.py)
-prompt_queue: asyncio.Queue = asyncio.Queue()
 
 # Session state
 session_start_time = time.time()
 prompts_processed = 0
 
+# ALB probes /health and /status every few seconds; serve a cached
+# response for a short window instead of rebuilding it on every probe
+PROBE_CACHE_TTL = 1.0
+_health_cache = {"t": 0.0, "payload": None}
+_status_cache = {"t": 0.0, "payload": None}
+
 
 class PromptRequest(BaseModel):
     """Request body for /prompt endpoint."""
@@ -61,22 +137,6 @@ class PromptResponse(BaseModel):
     queue_position: int
 
 
-class HealthResponse(BaseModel):
-    """Response body for /health endpoint."""
-    status: str
-    session_id: str
-    uptime_seconds: int
-
-
-class StatusResponse(BaseModel):
-    """Response body for /status endpoint."""
-    session_id: str
-    status: str
-    uptime_seconds: int
-    prompts_processed: int
-    queue_size: int
-
-
 @app.post("/prompt", response_model=PromptResponse)
 async def submit_prompt(request: PromptRequest):
     """
@@ -89,12 +149,20 @@ async def submit_prompt(request: PromptRequest):
     logger.info(f"Received prompt from {request.author}: {request.prompt[:100]}...")
 
     # Add to queue
-    await prompt_queue.put({
-        "prompt": request.prompt,
-        "author": request.author,
-        "comment_id": request.comment_id,
-        "submitted_at": time.time()
-    })
+    try:
+        prompt_queue.put_nowait({
+            "prompt": request.prompt,
+            "author": request.author,
+            "comment_id": request.comment_id,
+            "submitted_at": time.time()
+        })
+    except asyncio.QueueFull:
+        logger.warning(f"Prompt queue full ({PROMPT_QUEUE_MAX}), rejecting prompt")
+        raise HTTPException(
+            status_code=503,
+            detail="queue full, retry after backoff",
+            headers={"Retry-After": "1"},
+        )
 
     queue_size = prompt_queue.qsize()
     logger.info(f"Prompt queued, queue size: {queue_size}")
@@ -105,44 +173,86 @@ async def submit_prompt(request: PromptRequest):
     )
 
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
+@app.get("/health", response_model=None)
+async def health_check(response: Response) -> dict:
     """
     Health check endpoint.
 
-    Used by load balancers to verify container health.
+    Used by load balancers to verify container health. Returns a plain
+    dict serialized by orjson, skipping Pydantic on the probe path.
     """
-    session_id = os.environ.get("SESSION_ID", "unknown")
-    uptime = int(time.time() - session_start_time)
+    response.headers["Cache-Control"] = "no-store"
 
-    return HealthResponse(
-        status="healthy",
-        session_id=session_id,
-        uptime_seconds=uptime
-    )
+    now = time.monotonic()
+    if _health_cache["payload"] is not None and now - _health_cache["t"] < PROBE_CACHE_TTL:
+        return _health_cache["payload"]
 
+    payload = {
+        "status": "healthy",
+        "session_id": SESSION_ID,
+        "uptime_seconds": int(time.time() - session_start_time),
+    }
+    _health_cache["t"] = now
+    _health_cache["payload"] = payload
+    return payload
 
-@app.get("/status", response_model=StatusResponse)
-async def get_status():
+
+@app.get("/status", response_model=None)
+async def get_status(response: Response) -> dict:
     """
     Get detailed session status.
     """
-    session_id = os.environ.get("SESSION_ID", "unknown")
-    uptime = int(time.time() - session_start_time)
-
-    return StatusResponse(
-        session_id=session_id,
-        status="running",
-        uptime_seconds=uptime,
-        prompts_processed=prompts_processed,
-        queue_size=prompt_queue.qsize()
+    response.headers["Cache-Control"] = "no-store"
+
+    now = time.monotonic()
+    payload = _status_cache["payload"]
+    if payload is None or now - _status_cache["t"] >= PROBE_CACHE_TTL:
+        payload = {
+            "session_id": SESSION_ID,
+            "status": "running",
+            "uptime_seconds": int(time.time() - session_start_time),
+        }
+        _status_cache["t"] = now
+        _status_cache["payload"] = payload
+
+    # Counters are cheap to read, keep them fresh even on a cache hit
+    payload["prompts_processed"] = prompts_processed
+    payload["queue_size"] = prompt_queue.qsize()
+    return payload
+
+
+# Method each API path serves; other methods get a 405 instead of being
+# proxied to the dev server
+_API_ALLOW = {"/prompt": "POST", "/health": "GET", "/status": "GET"}
+_ALL_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"]
+
+
+@app.api_route("/prompt", methods=[m for m in _ALL_METHODS if m != "POST"], include_in_schema=False)
+@app.api_route("/health", methods=[m for m in _ALL_METHODS if m != "GET"], include_in_schema=False)
+@app.api_route("/status", methods=[m for m in _ALL_METHODS if m != "GET"], include_in_schema=False)
+async def api_method_not_allowed(request: Request):
+    """Reject wrong-method requests to the API paths."""
+    raise HTTPException(
+        status_code=405,
+        detail="Method Not Allowed",
+        headers={"Allow": _API_ALLOW[request.url.path]},
     )
 
 
-@app.api_route(
-    "/{path:path}",
-    methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"]
-)
+def _dev_server_unavailable() -> JSONResponse:
+    """Build the 503 response returned while the dev server is down."""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "Dev server not available",
+            "message": "The development server is starting up. Please wait a moment and refresh.",
+            "session_id": SESSION_ID
+        },
+        headers={"Retry-After": "2", "Cache-Control": "no-store"},
+    )
+
+
+@app.api_route("/{path:path}", methods=_ALL_METHODS)
 async def proxy_to_dev_server(request: Request, path: str):
     """
     Proxy all non-API requests to the dev server.
@@ -150,48 +260,54 @@ async def proxy_to_dev_server(request: Request, path: str):
     This allows the ALB to route all traffic to port 3000 (this server),
     and we forward non-API requests to the dev server on port 3001.
     """
-    # Don't proxy API paths (they should be handled by explicit routes above)
-    # If we get here for an API path, it means the route wasn't found
-    if path in ("prompt", "health", "status"):
-        raise HTTPException(status_code=404, detail=f"/{path} should use explicit route")
+    global _last_connect_err_ts
+
+    # API paths never get here: the API routes and api_method_not_allowed
+    # are registered first and cover every method, and Starlette matches
+    # them before this catch-all
+    if time.monotonic() - _last_connect_err_ts < CONNECT_ERROR_BACKOFF:
+        return _dev_server_unavailable()
 
     client = get_http_client()
 
-    # Build target URL
-    target_url = f"{DEV_SERVER_URL}/{path}"
-    if request.query_params:
-        target_url += f"?{request.query_params}"
+    # Any method may carry a body (DELETE with a payload, etc.); forward it
+    # whenever the client declared one
+    has_body = (
+        "transfer-encoding" in request.headers
+        or request.headers.get("content-length", "0") != "0"
+    )
+    drop = _REQ_DROP if has_body else _REQ_DROP_NO_BODY
 
     try:
-        # Forward the request
-        response = await client.request(
-            method=request.method,
-            url=target_url,
-            headers={
-                k: v for k, v in request.headers.items()
-                if k.lower() not in ("host", "content-length")
-            },
-            content=await request.body() if request.method in ("POST", "PUT", "PATCH") else None,
+        # Forward the request, streaming the response body back
+        proxy_request = client.build_request(
+            request.method,
+            f"/{path}",
+            params=request.query_params,
+            headers=[(k, v) for k, v in request.headers.raw if k not in drop],
+            # Stream request bodies through chunk-by-chunk instead of buffering
+            content=request.stream() if has_body else None,
         )
+        response = await client.send(proxy_request, stream=True)
 
-        # Return proxied response
-        return StreamingResponse(
-            content=response.iter_bytes(),
+        # Raw bytes are forwarded untouched, so content-encoding stays valid.
+        # Headers are copied as raw pairs to keep repeated ones (set-cookie)
+        proxied = StreamingResponse(
+            content=response.aiter_raw(),
             status_code=response.status_code,
-            headers={
-                k: v for k, v in response.headers.items()
-                if k.lower() not in ("content-encoding", "transfer-encoding", "content-length")
-            },
-            media_type=response.headers.get("content-type")
+            background=BackgroundTask(response.aclose),
         )
+        proxied.raw_headers = [
+            (k, v) for k, v in
+            ((k.lower(), v) for k, v in response.headers.raw)
+            if k not in _RESP_DROP
+        ]
+        return proxied
 
     except httpx.ConnectError:
         # Dev server not running yet
-        return {
-            "error": "Dev server not available",
-            "message": "The development server is starting up. Please wait a moment and refresh.",
-            "session_id": os.environ.get("SESSION_ID", "unknown")
-        }
+        _last_connect_err_ts = time.monotonic()
+        return _dev_server_unavailable()
     except Exception as e:
         logger.warning(f"Proxy error for {path}: {e}")
         raise HTTPException(status_code=502, detail=f"Proxy error: {e}")
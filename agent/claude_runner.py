@@ -5,15 +5,40 @@ Runs Claude Code as a subprocess and streams results to GitHub.
 """
 
 import asyncio
-import json
+import atexit
+import concurrent.futures
+import functools
+import inspect
 import logging
 import os
-import re
 import subprocess
 from typing import Any, Callable, Optional
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# StreamReader buffer limit for Claude Code stdout (single events such as
+# large tool results can far exceed asyncio's 64KB default)
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# Small persistent pool for blocking git subprocess calls, rather than
+# borrowing a thread from the default executor for every invocation
+_GIT_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="git")
+atexit.register(_GIT_POOL.shutdown, wait=False)
+
+
+def _callback_spec(callback: Optional[Callable]) -> Optional[tuple[Callable, bool]]:
+    """
+    Pair a stream callback with whether calling it returns a coroutine.
+
+    The flag is a fast path only: callers still await any awaitable result
+    (partials of async functions, callable objects with an async __call__).
+    """
+    if callback is None:
+        return None
+    return callback, inspect.iscoroutinefunction(callback)
+
 
 class ClaudeRunner:
     """
@@ -32,6 +57,12 @@ class ClaudeRunner:
         """
         self.workspace = workspace
         self.conversation_id = None
+        self._summary_full = False  # Set once summary_parts has 3 entries
+
+        # Stream callbacks for the current run as (callback, is_coroutine)
+        self._cb_text: Optional[tuple[Callable, bool]] = None
+        self._cb_tool_use: Optional[tuple[Callable, bool]] = None
+        self._cb_tool_result: Optional[tuple[Callable, bool]] = None
 
     async def run_prompt(
         self,
@@ -121,7 +152,9 @@ class ClaudeRunner:
 
         Parses JSON stream and calls callbacks for each event.
         """
-        logger.info(f"Running: {' '.join(cmd)}")
+        # cmd embeds the full prompt - only join it if it will be logged
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Running: %s", " ".join(cmd))
 
         env = os.environ.copy()
         env["CLAUDE_CODE_USE_BEDROCK"] = "1"
@@ -132,64 +165,58 @@ class ClaudeRunner:
             stderr=asyncio.subprocess.PIPE,
             cwd=self.workspace,
             env=env,
+            limit=STREAM_LINE_LIMIT,
         )
 
+        # Resolve sync vs async once per run instead of per event
+        self._cb_text = _callback_spec(on_text)
+        self._cb_tool_use = _callback_spec(on_tool_use)
+        self._cb_tool_result = _callback_spec(on_tool_result)
+
         summary_parts = []
+        self._summary_full = False
         pending_tool_uses = {}  # Track tool_use_id -> (name, input)
-        buffer = b""  # Buffer for incomplete lines
 
         try:
-            # Read stdout in chunks to handle large JSON lines
-            # (readline() has a 64KB limit which Claude Code can exceed)
+            # Read one event line at a time; the raised StreamReader limit
+            # lets Claude Code's large JSON lines through readuntil()
             while True:
+                at_eof = False
                 try:
-                    chunk = await asyncio.wait_for(
-                        process.stdout.read(1024 * 1024),  # Read up to 1MB at a time
+                    line = await asyncio.wait_for(
+                        process.stdout.readuntil(b"\n"),
                         timeout=600  # 10 minute timeout
                     )
                 except asyncio.TimeoutError:
                     logger.error("Claude Code timed out")
                     process.kill()
                     return {"returncode": -1, "stderr": "Timeout"}
-
-                if not chunk:
-                    # Process any remaining data in buffer
-                    if buffer:
-                        line_str = buffer.decode("utf-8").strip()
-                        if line_str:
-                            try:
-                                data = json.loads(line_str)
-                                await self._handle_stream_event(
-                                    data, pending_tool_uses, summary_parts,
-                                    on_tool_use, on_tool_result, on_text,
-                                )
-                            except json.JSONDecodeError:
-                                logger.debug(f"Non-JSON output: {line_str[:200]}")
-                    break
-
-                buffer += chunk
-
-                # Process complete lines from buffer
-                while b"\n" in buffer:
-                    line, buffer = buffer.split(b"\n", 1)
-                    line_str = line.decode("utf-8").strip()
-                    if not line_str:
-                        continue
-
-                    # Try to parse as JSON
+                except asyncio.IncompleteReadError as e:
+                    # EOF - whatever is left is the final unterminated line
+                    line = e.partial
+                    at_eof = True
+                except asyncio.LimitOverrunError as e:
+                    # Line larger than the reader limit - drop what is
+                    # buffered; the remainder is skipped as non-JSON
+                    logger.warning(f"Dropping oversized output line ({e.consumed} bytes)")
+                    await process.stdout.readexactly(e.consumed)
+                    continue
+
+                if line.strip():
                     try:
-                        data = json.loads(line_str)
+                        data = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # Not JSON, log it
+                        logger.debug(f"Non-JSON output: {line[:200]!r}")
+                    else:
                         await self._handle_stream_event(
                             data,
                             pending_tool_uses,
                             summary_parts,
-                            on_tool_use,
-                            on_tool_result,
-                            on_text,
                         )
-                    except json.JSONDecodeError:
-                        # Not JSON, log it
-                        logger.debug(f"Non-JSON output: {line_str[:200]}")
+
+                if at_eof:
+                    break
 
         except Exception as e:
             logger.error(f"Error reading Claude Code output: {e}")
@@ -213,9 +240,6 @@ class ClaudeRunner:
         data: dict,
         pending_tool_uses: dict,
         summary_parts: list,
-        on_tool_use: Optional[Callable],
-        on_tool_result: Optional[Callable],
-        on_text: Optional[Callable],
     ) -> None:
         """Handle a single stream event."""
         msg_type = data.get("type")
@@ -231,14 +255,17 @@ class ClaudeRunner:
                     text = item.get("text", "").strip()
                     if text:
                         # Collect for summary
-                        if len(summary_parts) < 3:
+                        if not self._summary_full:
                             summary_parts.append(text[:200])
+                            if len(summary_parts) >= 3:
+                                self._summary_full = True
 
                         # Callback
-                        if on_text:
+                        if self._cb_text:
                             try:
-                                result = on_text(text)
-                                if asyncio.iscoroutine(result):
+                                cb, is_coro = self._cb_text
+                                result = cb(text)
+                                if is_coro or inspect.isawaitable(result):
                                     await result
                             except Exception as e:
                                 logger.warning(f"on_text callback error: {e}")
@@ -254,10 +281,11 @@ class ClaudeRunner:
                     logger.info(f"Tool use: {tool_name}")
 
                     # Callback
-                    if on_tool_use:
+                    if self._cb_tool_use:
                         try:
-                            result = on_tool_use(tool_name, tool_input)
-                            if asyncio.iscoroutine(result):
+                            cb, is_coro = self._cb_tool_use
+                            result = cb(tool_name, tool_input)
+                            if is_coro or inspect.isawaitable(result):
                                 await result
                         except Exception as e:
                             logger.warning(f"on_tool_use callback error: {e}")
@@ -276,20 +304,21 @@ class ClaudeRunner:
                     # Extract result text
                     if isinstance(result_content, list):
                         # Handle structured content
-                        result_text = ""
-                        for part in result_content:
-                            if isinstance(part, dict) and part.get("type") == "text":
-                                result_text += part.get("text", "")
+                        result_text = "".join([
+                            part.get("text", "") for part in result_content
+                            if isinstance(part, dict) and part.get("type") == "text"
+                        ])
                     else:
                         result_text = str(result_content)
 
                     logger.info(f"Tool result: {'error' if is_error else 'success'}")
 
                     # Callback
-                    if on_tool_result:
+                    if self._cb_tool_result:
                         try:
-                            result = on_tool_result(result_text, is_error)
-                            if asyncio.iscoroutine(result):
+                            cb, is_coro = self._cb_tool_result
+                            result = cb(result_text, is_error)
+                            if is_coro or inspect.isawaitable(result):
                                 await result
                         except Exception as e:
                             logger.warning(f"on_tool_result callback error: {e}")
@@ -301,6 +330,20 @@ class ClaudeRunner:
                 self.conversation_id = session_id
                 logger.info(f"Session ID: {session_id}")
 
+    async def _run_git(self, args: list[str], timeout: int = 60) -> subprocess.CompletedProcess:
+        """Run a git command in the workspace on the git thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            _GIT_POOL,
+            functools.partial(
+                subprocess.run,
+                args,
+                cwd=self.workspace,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            ),
+        )
+
     async def _get_recent_commits(self) -> list[str]:
         """
         Get recent commits made during this session.
@@ -309,13 +352,15 @@ class ClaudeRunner:
             List of recent commit messages (last 5)
         """
         try:
-            result = await asyncio.to_thread(
-                subprocess.run,
-                ["git", "log", "--oneline", "-5", "--format=%h %s"],
-                cwd=self.workspace,
-                capture_output=True,
-                text=True
+            return await asyncio.get_running_loop().run_in_executor(
+                _GIT_POOL, self._read_reflog_commits
             )
+        except OSError:
+            # No plain .git directory (worktree, bare repo) - ask git
+            pass
+
+        try:
+            result = await self._run_git(["git", "log", "--oneline", "-5", "--format=%h %s"])
 
             if result.returncode == 0 and result.stdout.strip():
                 return result.stdout.strip().split("\n")
@@ -325,6 +370,35 @@ class ClaudeRunner:
 
         return []
 
+    def _read_reflog_commits(self, limit: int = 5) -> list[str]:
+        """
+        Read recent commits straight from the HEAD reflog.
+
+        Each reflog line is "<old> <new> <author> <ts> <tz>\t<message>";
+        only "commit..." entries are kept, so clone/checkout/pull records
+        are not reported as commits. Newest first, formatted like
+        "git log --format='%h %s'".
+
+        Raises:
+            OSError: If the reflog cannot be read
+        """
+        reflog = os.path.join(self.workspace, ".git", "logs", "HEAD")
+        with open(reflog, "rb") as f:
+            data = f.read()
+
+        commits = []
+        for line in reversed(data.splitlines()):
+            header, _, message = line.partition(b"\t")
+            if not message.startswith(b"commit"):
+                continue
+            sha = header.split(b" ", 2)[1][:7]
+            subject = message.partition(b": ")[2]
+            commits.append(f"{sha.decode()} {subject.decode('utf-8', 'replace')}")
+            if len(commits) >= limit:
+                break
+
+        return commits
+
     async def push_changes(self) -> bool:
         """
         Push committed changes to remote.
@@ -333,14 +407,7 @@ class ClaudeRunner:
             True if push succeeded
         """
         try:
-            result = await asyncio.to_thread(
-                subprocess.run,
-                ["git", "push", "origin", "HEAD"],
-                cwd=self.workspace,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = await self._run_git(["git", "push", "origin", "HEAD"])
 
             if result.returncode != 0:
                 logger.error(f"Git push failed: {result.stderr}")
@@ -5,16 +5,73 @@ Automatically detects and starts the target application's dev server.
 """
 
 import asyncio
-import json
 import logging
+import mmap
 import os
+import re
+import shlex
 import signal
-import subprocess
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Project markers: requirement lines start with the package name, while
+# pyproject.toml may list dependencies inline, so match it anywhere
+_REQUIREMENTS_MARKER_RE = re.compile(rb"(?im)^\s*(uvicorn|flask|django|fastapi)\b")
+_PYPROJECT_MARKER_RE = re.compile(rb"(?i)\b(uvicorn|fastapi)\b|\[(tool\.poetry)\]")
+
+# Dev command templates for Python frameworks, filled in with the app
+# module and the dev server port
+_UVICORN_TMPL = "uvicorn {module}:app --host 0.0.0.0 --port {port} --reload"
+_FLASK_TMPL = "flask run --host 0.0.0.0 --port {port}"
+_DJANGO_TMPL = "python manage.py runserver 0.0.0.0:{port}"
+
+# A flat "scripts" object in package.json, so only that block is decoded
+# rather than the (often much larger) dependency trees
+_SCRIPTS_RE = re.compile(rb'"scripts"\s*:\s*(\{[^{}]*\})')
+_JSON_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"')
+
+
+def _is_top_level(raw: bytes, pos: int) -> bool:
+    """Whether pos is directly inside the document's root object."""
+    # Drop string literals so braces and quotes inside them don't count; a
+    # stray quote left over means pos itself is inside a string
+    prefix = _JSON_STRING_RE.sub(b"", raw[:pos])
+    return b'"' not in prefix and prefix.count(b"{") - prefix.count(b"}") == 1
+
+
+def _scan_markers(path: Path, pattern: re.Pattern) -> frozenset[str]:
+    """
+    Collect the lowercased markers matched in a project file.
+
+    The file is memory-mapped and scanned in place, so large files are
+    never copied into a Python string.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file - nothing to map
+            return frozenset()
+        with mm:
+            return frozenset(
+                m.group(m.lastindex).decode().lower() for m in pattern.finditer(mm)
+            )
+
+
+@dataclass
+class _WorkspaceFacts:
+    """Project files read once per detection sweep and shared by detectors."""
+    top_names: frozenset[str]  # Entry names in the workspace root
+    package_scripts: Optional[dict]  # package.json "scripts", None without package.json
+    pyproject_markers: frozenset[str]
+    requirements_markers: frozenset[str]
+    package_manager: str
+
 
 class DevServerManager:
     """
@@ -23,16 +80,16 @@ class DevServerManager:
     Auto-detects the appropriate dev command based on project files.
     """
 
-    # Detection priority order
-    DETECTION_ORDER = [
-        "package_json_dev",
-        "package_json_start",
-        "pyproject_poetry",
-        "pyproject_uvicorn",
-        "requirements_uvicorn",
-        "requirements_flask",
-        "requirements_django",
-    ]
+    # Port arguments passed through `<pm> run dev` for known frameworks,
+    # checked in order against the dev script
+    FRAMEWORK_PORT_ARGS = {
+        "vite": "-- --port {port} --host",
+        "next": "-- -p {port}",
+    }
+    DEFAULT_PORT_ARGS = "-- --port {port}"
+
+    # How long to wait for a previous server to release the port
+    PORT_FREE_TIMEOUT = 10.0
 
     def __init__(self, workspace: str):
         """
@@ -42,7 +99,7 @@ class DevServerManager:
             workspace: Path to the project workspace
         """
         self.workspace = Path(workspace)
-        self.process: Optional[subprocess.Popen] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
         # Run dev server on 3001 (internal) - API server on 3000 proxies to it
         self.port = 3001
 
@@ -54,45 +111,29 @@ class DevServerManager:
             True if server started successfully
         """
         # Detect project type
-        cmd, install_cmd = self._detect_dev_command()
+        cmd, install_cmd = await self._detect_dev_command()
 
         if not cmd:
             logger.warning("Could not detect dev server command")
             return False
 
-        # Install dependencies if needed
-        if install_cmd:
-            logger.info(f"Installing dependencies: {install_cmd}")
-            try:
-                install_result = await asyncio.to_thread(
-                    subprocess.run,
-                    install_cmd,
-                    shell=True,
-                    cwd=self.workspace,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minute timeout for install
-                )
-                if install_result.returncode != 0:
-                    logger.error(f"Dependency install failed: {install_result.stderr}")
-                    # Continue anyway, might work
-            except Exception as e:
-                logger.warning(f"Dependency install error: {e}")
+        # Install dependencies while checking the port is free; only the
+        # spawn below has to wait for both
+        async with asyncio.TaskGroup() as tg:
+            if install_cmd:
+                tg.create_task(self._run_install(install_cmd))
+            tg.create_task(self._wait_for_port_free())
 
         # Start dev server
         logger.info(f"Starting dev server: {cmd}")
         try:
-            env = os.environ.copy()
-            env["PORT"] = str(self.port)
-
-            self.process = subprocess.Popen(
-                cmd,
-                shell=True,
-                cwd=self.workspace,
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                preexec_fn=os.setsid  # Create new process group for cleanup
+            self.process = await asyncio.create_subprocess_exec(
+                *shlex.split(cmd),
+                cwd=str(self.workspace),
+                env={**os.environ, "PORT": str(self.port)},
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True  # New process group for cleanup
             )
 
             # Start log forwarding
@@ -101,7 +142,7 @@ class DevServerManager:
             # Wait a moment for server to start
             await asyncio.sleep(3)
 
-            if self.process.poll() is None:
+            if self.process.returncode is None:
                 logger.info(f"Dev server started on port {self.port}")
                 return True
             else:
@@ -112,16 +153,58 @@ class DevServerManager:
             logger.exception(f"Failed to start dev server: {e}")
             return False
 
-    def stop(self) -> None:
+    async def _run_install(self, install_cmd: str) -> None:
+        """Install project dependencies, logging (not raising) failures."""
+        logger.info(f"Installing dependencies: {install_cmd}")
+        try:
+            install_proc = await asyncio.create_subprocess_shell(
+                install_cmd,
+                cwd=str(self.workspace),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            try:
+                install_output, _ = await asyncio.wait_for(
+                    install_proc.communicate(),
+                    timeout=300  # 5 minute timeout for install
+                )
+            except asyncio.TimeoutError:
+                install_proc.kill()
+                await install_proc.wait()
+                raise
+            if install_proc.returncode != 0:
+                logger.error(
+                    f"Dependency install failed: {install_output.decode(errors='replace')}"
+                )
+                # Continue anyway, might work
+        except Exception as e:
+            logger.warning(f"Dependency install error: {e!r}")
+
+    async def _wait_for_port_free(self) -> None:
+        """Wait briefly for anything still listening on the dev server port to go away."""
+        deadline = asyncio.get_running_loop().time() + self.PORT_FREE_TIMEOUT
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            except OSError:
+                return  # Nothing listening
+            writer.close()
+
+            if asyncio.get_running_loop().time() >= deadline:
+                logger.warning(f"Port {self.port} is still in use; starting dev server anyway")
+                return
+            await asyncio.sleep(0.5)
+
+    async def stop(self) -> None:
         """Stop the dev server."""
         if self.process:
             logger.info("Stopping dev server...")
             try:
                 # Kill the process group
                 os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
-                self.process.wait(timeout=10)
+                await asyncio.wait_for(self.process.wait(), timeout=10)
             except Exception as e:
-                logger.warning(f"Error stopping dev server: {e}")
+                logger.warning(f"Error stopping dev server: {e!r}")
                 try:
                     self.process.kill()
                 except Exception:
@@ -134,226 +217,250 @@ class DevServerManager:
             return
 
         try:
-            while self.process.poll() is None:
-                line = await asyncio.to_thread(self.process.stdout.readline)
-                if line:
-                    logger.info(f"[dev-server] {line.decode().rstrip()}")
-                else:
-                    await asyncio.sleep(0.1)
+            while True:
+                try:
+                    async for raw in self.process.stdout:
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info("[dev-server] %s", raw.decode(errors="replace").rstrip())
+                    break
+                except ValueError:
+                    # Line over the StreamReader limit was discarded; keep
+                    # draining so the dev server never blocks on a full pipe
+                    continue
         except Exception as e:
             logger.warning(f"Log forwarding ended: {e}")
 
-    def _detect_dev_command(self) -> tuple[Optional[str], Optional[str]]:
+    async def _detect_dev_command(self) -> tuple[Optional[str], Optional[str]]:
         """
         Detect the appropriate dev command for this project.
 
         Returns:
             Tuple of (dev_command, install_command) or (None, None)
         """
-        for detector in self.DETECTION_ORDER:
-            method = getattr(self, f"_detect_{detector}", None)
-            if method:
-                result = method()
-                if result[0]:
-                    logger.info(f"Detected project type: {detector}")
-                    return result
+        facts = await self._collect_workspace_facts()
+
+        for name, detect in self._DETECTORS:
+            result = detect(self, facts)
+            if result[0]:
+                logger.info(f"Detected project type: {name}")
+                return result
 
         return None, None
 
-    def _detect_package_json_dev(self) -> tuple[Optional[str], Optional[str]]:
-        """Detect npm/pnpm/yarn project with 'dev' script."""
-        package_json = self.workspace / "package.json"
-        if not package_json.exists():
-            return None, None
+    async def _collect_workspace_facts(self) -> _WorkspaceFacts:
+        """
+        Read each project file used by the detectors at most once.
 
+        The files are independent, so they are read concurrently in worker
+        threads; on a cold cache detection waits for the slowest read
+        rather than the sum of them.
+        """
+        # One directory listing answers every existence check below
         try:
-            with open(package_json) as f:
-                pkg = json.load(f)
-
-            scripts = pkg.get("scripts", {})
-            if "dev" not in scripts:
-                return None, None
-
-            # Detect package manager
-            pm = self._detect_package_manager()
-            install_cmd = f"{pm} install"
-
-            # Check the dev script to determine how to pass port
-            dev_script = scripts.get("dev", "")
-
-            # Build command with port override
-            # Most frameworks (Vite, Next.js) accept --port via passthrough
-            if "vite" in dev_script.lower():
-                # Vite uses -- --port
-                dev_cmd = f"{pm} run dev -- --port {self.port} --host"
-            elif "next" in dev_script.lower():
-                # Next.js uses -p
-                dev_cmd = f"{pm} run dev -- -p {self.port}"
-            else:
-                # Default: pass --port and hope it works, or rely on PORT env
-                dev_cmd = f"{pm} run dev -- --port {self.port}"
+            with os.scandir(self.workspace) as entries:
+                top_names = frozenset(entry.name for entry in entries)
+        except OSError as e:
+            logger.warning(f"Error listing workspace: {e}")
+            top_names = frozenset()
+
+        package_scripts, pyproject_markers, requirements_markers = await asyncio.gather(
+            asyncio.to_thread(self._load_package_scripts, top_names),
+            asyncio.to_thread(self._file_markers, "pyproject.toml", _PYPROJECT_MARKER_RE, top_names),
+            asyncio.to_thread(self._file_markers, "requirements.txt", _REQUIREMENTS_MARKER_RE, top_names),
+        )
+
+        return _WorkspaceFacts(
+            top_names=top_names,
+            package_scripts=package_scripts,
+            pyproject_markers=pyproject_markers,
+            requirements_markers=requirements_markers,
+            package_manager=self._detect_package_manager(top_names),
+        )
+
+    def _load_package_scripts(self, top_names: frozenset[str]) -> Optional[dict]:
+        """
+        Get the "scripts" object from package.json.
 
-            return dev_cmd, install_cmd
+        Decodes just the scripts block when it can be located unambiguously,
+        falling back to parsing the whole file otherwise.
 
+        Returns:
+            The scripts dict ({} if absent), or None if package.json is
+            missing or invalid
+        """
+        if "package.json" not in top_names:
+            return None
+        try:
+            raw = (self.workspace / "package.json").read_bytes()
+            # Only trust a match that is provably the root object's key; a
+            # nested "scripts" (workspaces, pnpm config) must not be used
+            blocks = [m for m in _SCRIPTS_RE.finditer(raw) if _is_top_level(raw, m.start())]
+            if len(blocks) == 1:
+                try:
+                    scripts = orjson.loads(blocks[0].group(1))
+                    if isinstance(scripts, dict):
+                        return scripts
+                except orjson.JSONDecodeError:
+                    pass
+
+            pkg = orjson.loads(raw)
+        except FileNotFoundError:
+            return None
         except Exception as e:
             logger.warning(f"Error reading package.json: {e}")
+            return None
+
+        if not isinstance(pkg, dict):
+            return None
+        scripts = pkg.get("scripts", {})
+        return scripts if isinstance(scripts, dict) else {}
+
+    def _file_markers(self, name: str, pattern: re.Pattern, top_names: frozenset[str]) -> frozenset[str]:
+        """Scan a workspace file for markers, or return none if it does not exist."""
+        if name not in top_names:
+            return frozenset()
+        try:
+            return _scan_markers(self.workspace / name, pattern)
+        except FileNotFoundError:
+            return frozenset()
+        except Exception as e:
+            logger.warning(f"Error reading {name}: {e}")
+            return frozenset()
+
+    def _detect_package_json_dev(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
+        """Detect npm/pnpm/yarn project with 'dev' script."""
+        scripts = facts.package_scripts
+        if scripts is None:
             return None, None
 
-    def _detect_package_json_start(self) -> tuple[Optional[str], Optional[str]]:
-        """Detect npm project with 'start' script."""
-        package_json = self.workspace / "package.json"
-        if not package_json.exists():
+        if "dev" not in scripts:
             return None, None
 
-        try:
-            with open(package_json) as f:
-                pkg = json.load(f)
+        pm = facts.package_manager
+        install_cmd = f"{pm} install"
 
-            scripts = pkg.get("scripts", {})
-            if "start" not in scripts:
-                return None, None
+        # Check the dev script to determine how to pass port
+        dev_script = scripts.get("dev", "")
 
-            pm = self._detect_package_manager()
-            install_cmd = f"{pm} install"
-            start_cmd = f"{pm} start"
+        # Build command with port override for the first framework marker
+        # found in the script; default passes --port (or relies on PORT env)
+        script_lower = dev_script.lower()
+        port_args = next(
+            (args for marker, args in self.FRAMEWORK_PORT_ARGS.items() if marker in script_lower),
+            self.DEFAULT_PORT_ARGS,
+        )
+        dev_cmd = f"{pm} run dev {port_args.format(port=self.port)}"
 
-            return start_cmd, install_cmd
+        return dev_cmd, install_cmd
 
-        except Exception as e:
-            logger.warning(f"Error reading package.json: {e}")
+    def _detect_package_json_start(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
+        """Detect npm project with 'start' script."""
+        scripts = facts.package_scripts
+        if scripts is None:
+            return None, None
+
+        if "start" not in scripts:
             return None, None
 
-    def _detect_package_manager(self) -> str:
-        """Detect which package manager to use."""
-        if (self.workspace / "pnpm-lock.yaml").exists():
+        pm = facts.package_manager
+        install_cmd = f"{pm} install"
+        start_cmd = f"{pm} start"
+
+        return start_cmd, install_cmd
+
+    def _detect_package_manager(self, top_names: frozenset[str]) -> str:
+        """Detect which package manager to use from the lockfile present."""
+        if "pnpm-lock.yaml" in top_names:
             return "pnpm"
-        if (self.workspace / "yarn.lock").exists():
+        if "yarn.lock" in top_names:
             return "yarn"
         return "npm"
 
-    def _detect_pyproject_poetry(self) -> tuple[Optional[str], Optional[str]]:
+    def _detect_pyproject_poetry(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
         """Detect Poetry project."""
-        pyproject = self.workspace / "pyproject.toml"
-        if not pyproject.exists():
+        if "tool.poetry" not in facts.pyproject_markers:
             return None, None
 
-        try:
-            content = pyproject.read_text()
-            if "[tool.poetry]" not in content:
-                return None, None
-
-            # Look for common entry points
-            if "uvicorn" in content.lower() or "fastapi" in content.lower():
-                return (
-                    "poetry run uvicorn main:app --host 0.0.0.0 --port 3000 --reload",
-                    "poetry install"
-                )
-
-            # Try to find main module
-            if (self.workspace / "main.py").exists():
-                return "poetry run python main.py", "poetry install"
+        # Look for common entry points
+        if "uvicorn" in facts.pyproject_markers or "fastapi" in facts.pyproject_markers:
+            return (
+                "poetry run " + _UVICORN_TMPL.format(module="main", port=self.port),
+                "poetry install"
+            )
 
-            return None, "poetry install"
+        # Try to find main module
+        if "main.py" in facts.top_names:
+            return "poetry run python main.py", "poetry install"
 
-        except Exception as e:
-            logger.warning(f"Error reading pyproject.toml: {e}")
-            return None, None
+        return None, "poetry install"
 
-    def _detect_pyproject_uvicorn(self) -> tuple[Optional[str], Optional[str]]:
+    def _detect_pyproject_uvicorn(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
         """Detect pyproject.toml with uvicorn dependency."""
-        pyproject = self.workspace / "pyproject.toml"
-        if not pyproject.exists():
+        if "uvicorn" not in facts.pyproject_markers:
             return None, None
 
-        try:
-            content = pyproject.read_text()
-            if "uvicorn" not in content.lower():
-                return None, None
-
-            # Find main app file
-            for app_file in ["main.py", "app.py", "api.py"]:
-                if (self.workspace / app_file).exists():
-                    module = app_file.replace(".py", "")
-                    return (
-                        f"uvicorn {module}:app --host 0.0.0.0 --port 3000 --reload",
-                        "pip install -e ."
-                    )
-
-            return None, None
+        # Find main app file
+        for app_file in ["main.py", "app.py", "api.py"]:
+            if app_file in facts.top_names:
+                module = app_file.replace(".py", "")
+                return (
+                    _UVICORN_TMPL.format(module=module, port=self.port),
+                    "pip install -e ."
+                )
 
-        except Exception as e:
-            logger.warning(f"Error: {e}")
-            return None, None
+        return None, None
 
-    def _detect_requirements_uvicorn(self) -> tuple[Optional[str], Optional[str]]:
+    def _detect_requirements_uvicorn(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
         """Detect requirements.txt with uvicorn."""
-        req_file = self.workspace / "requirements.txt"
-        if not req_file.exists():
+        if "uvicorn" not in facts.requirements_markers:
             return None, None
 
-        try:
-            content = req_file.read_text()
-            if "uvicorn" not in content.lower():
-                return None, None
-
-            # Find main app file
-            for app_file in ["main.py", "app.py", "api.py"]:
-                if (self.workspace / app_file).exists():
-                    module = app_file.replace(".py", "")
-                    return (
-                        f"uvicorn {module}:app --host 0.0.0.0 --port 3000 --reload",
-                        "pip install -r requirements.txt"
-                    )
-
-            return None, None
+        # Find main app file
+        for app_file in ["main.py", "app.py", "api.py"]:
+            if app_file in facts.top_names:
+                module = app_file.replace(".py", "")
+                return (
+                    _UVICORN_TMPL.format(module=module, port=self.port),
+                    "pip install -r requirements.txt"
+                )
 
-        except Exception as e:
-            logger.warning(f"Error: {e}")
-            return None, None
+        return None, None
 
-    def _detect_requirements_flask(self) -> tuple[Optional[str], Optional[str]]:
+    def _detect_requirements_flask(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
         """Detect Flask application."""
-        req_file = self.workspace / "requirements.txt"
-        if not req_file.exists():
+        if "flask" not in facts.requirements_markers:
             return None, None
 
-        try:
-            content = req_file.read_text()
-            if "flask" not in content.lower():
-                return None, None
-
-            # Find main app file
-            for app_file in ["app.py", "main.py", "wsgi.py"]:
-                if (self.workspace / app_file).exists():
-                    return (
-                        f"flask run --host 0.0.0.0 --port 3000",
-                        "pip install -r requirements.txt"
-                    )
-
-            return None, None
+        # Find main app file
+        for app_file in ["app.py", "main.py", "wsgi.py"]:
+            if app_file in facts.top_names:
+                return (
+                    _FLASK_TMPL.format(port=self.port),
+                    "pip install -r requirements.txt"
+                )
 
-        except Exception as e:
-            logger.warning(f"Error: {e}")
-            return None, None
+        return None, None
 
-    def _detect_requirements_django(self) -> tuple[Optional[str], Optional[str]]:
+    def _detect_requirements_django(self, facts: _WorkspaceFacts) -> tuple[Optional[str], Optional[str]]:
         """Detect Django application."""
-        req_file = self.workspace / "requirements.txt"
-        manage_py = self.workspace / "manage.py"
-
-        if not req_file.exists() or not manage_py.exists():
+        if "manage.py" not in facts.top_names:
             return None, None
 
-        try:
-            content = req_file.read_text()
-            if "django" not in content.lower():
-                return None, None
-
-            return (
-                "python manage.py runserver 0.0.0.0:3000",
-                "pip install -r requirements.txt"
-            )
-
-        except Exception as e:
-            logger.warning(f"Error: {e}")
+        if "django" not in facts.requirements_markers:
             return None, None
+
+        return (
+            _DJANGO_TMPL.format(port=self.port),
+            "pip install -r requirements.txt"
+        )
+
+    # Detection priority order, resolved once at class definition
+    _DETECTORS = (
+        ("package_json_dev", _detect_package_json_dev),
+        ("package_json_start", _detect_package_json_start),
+        ("pyproject_poetry", _detect_pyproject_poetry),
+        ("pyproject_uvicorn", _detect_pyproject_uvicorn),
+        ("requirements_uvicorn", _detect_requirements_uvicorn),
+        ("requirements_flask", _detect_requirements_flask),
+        ("requirements_django", _detect_requirements_django),
+    )
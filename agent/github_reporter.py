@@ -6,17 +6,104 @@ Supports streaming updates for tool use and results.
 """
 
 import asyncio
+import atexit
 import json
 import logging
 import os
+import threading
 import time
-from typing import Any, Optional
+from collections import deque
+from itertools import zip_longest
+from typing import Any, Callable, Optional
 
+import httpx
 import jwt
+import orjson
 import requests
+from cryptography.hazmat.primitives import serialization
 
 logger = logging.getLogger(__name__)
 
+# Headers sent on every GitHub API call; only Authorization varies per request
+GITHUB_API_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28"
+}
+
+# Keep-alive session for the synchronous token path, so the installation
+# lookup and token request reuse one connection to api.github.com
+_SESSION = requests.Session()
+_SESSION.headers.update(GITHUB_API_HEADERS)
+atexit.register(_SESSION.close)
+
+
+def _fmt_read(tool_input: dict[str, Any]) -> str:
+    path = tool_input.get("file_path", "unknown")
+    return f"📖 **Reading:** `{path}`"
+
+
+def _fmt_write(tool_input: dict[str, Any]) -> str:
+    path = tool_input.get("file_path", "unknown")
+    content = tool_input.get("content", "")
+    preview = content[:300] + "..." if len(content) > 300 else content
+    return f"✏️ **Writing:** `{path}`\n```\n{preview}\n```"
+
+
+def _fmt_edit(tool_input: dict[str, Any]) -> str:
+    path = tool_input.get("file_path", "unknown")
+    old = tool_input.get("old_string", "")[:150]
+    new = tool_input.get("new_string", "")[:150]
+    return f"✏️ **Editing:** `{path}`\n\n```diff\n- {old}\n+ {new}\n```"
+
+
+def _fmt_bash(tool_input: dict[str, Any]) -> str:
+    cmd = tool_input.get("command", "")
+    desc = tool_input.get("description", "")
+    if desc:
+        return f"💻 **Running:** `{cmd}`\n_{desc}_"
+    return f"💻 **Running:** `{cmd}`"
+
+
+def _fmt_glob(tool_input: dict[str, Any]) -> str:
+    pattern = tool_input.get("pattern", "")
+    return f"🔍 **Finding files:** `{pattern}`"
+
+
+def _fmt_grep(tool_input: dict[str, Any]) -> str:
+    pattern = tool_input.get("pattern", "")
+    return f"🔎 **Searching:** `{pattern}`"
+
+
+def _fmt_task(tool_input: dict[str, Any]) -> str:
+    desc = tool_input.get("description", "subtask")
+    return f"🤖 **Spawning agent:** {desc}"
+
+
+def _fmt_ask(tool_input: dict[str, Any]) -> str:
+    questions = tool_input.get("questions", [])
+    if questions:
+        q = questions[0].get("question", "")
+        return f"❓ **Question:** {q}"
+    return "❓ **Asking a question**"
+
+
+def _fmt_generic(tool_name: str, tool_input: dict[str, Any]) -> str:
+    input_preview = json.dumps(tool_input, indent=2)[:300]
+    return f"🔧 **{tool_name}**\n```json\n{input_preview}\n```"
+
+
+# Display formatters for known tools; anything else uses _fmt_generic
+_TOOL_FORMATTERS: dict[str, Callable[[dict[str, Any]], str]] = {
+    "Read": _fmt_read,
+    "Write": _fmt_write,
+    "Edit": _fmt_edit,
+    "Bash": _fmt_bash,
+    "Glob": _fmt_glob,
+    "Grep": _fmt_grep,
+    "Task": _fmt_task,
+    "AskUserQuestion": _fmt_ask,
+}
+
 
 def format_tool_use(tool_name: str, tool_input: dict[str, Any]) -> str:
     """
@@ -29,52 +116,10 @@ def format_tool_use(tool_name: str, tool_input: dict[str, Any]) -> str:
     Returns:
         Formatted markdown string
     """
-    if tool_name == "Read":
-        path = tool_input.get("file_path", "unknown")
-        return f"📖 **Reading:** `{path}`"
-
-    elif tool_name == "Write":
-        path = tool_input.get("file_path", "unknown")
-        content = tool_input.get("content", "")
-        preview = content[:300] + "..." if len(content) > 300 else content
-        return f"✏️ **Writing:** `{path}`\n```\n{preview}\n```"
-
-    elif tool_name == "Edit":
-        path = tool_input.get("file_path", "unknown")
-        old = tool_input.get("old_string", "")[:150]
-        new = tool_input.get("new_string", "")[:150]
-        return f"✏️ **Editing:** `{path}`\n\n```diff\n- {old}\n+ {new}\n```"
-
-    elif tool_name == "Bash":
-        cmd = tool_input.get("command", "")
-        desc = tool_input.get("description", "")
-        if desc:
-            return f"💻 **Running:** `{cmd}`\n_{desc}_"
-        return f"💻 **Running:** `{cmd}`"
-
-    elif tool_name == "Glob":
-        pattern = tool_input.get("pattern", "")
-        return f"🔍 **Finding files:** `{pattern}`"
-
-    elif tool_name == "Grep":
-        pattern = tool_input.get("pattern", "")
-        return f"🔎 **Searching:** `{pattern}`"
-
-    elif tool_name == "Task":
-        desc = tool_input.get("description", "subtask")
-        return f"🤖 **Spawning agent:** {desc}"
-
-    elif tool_name == "AskUserQuestion":
-        questions = tool_input.get("questions", [])
-        if questions:
-            q = questions[0].get("question", "")
-            return f"❓ **Question:** {q}"
-        return "❓ **Asking a question**"
-
-    else:
-        # Generic tool display
-        input_preview = json.dumps(tool_input, indent=2)[:300]
-        return f"🔧 **{tool_name}**\n```json\n{input_preview}\n```"
+    formatter = _TOOL_FORMATTERS.get(tool_name)
+    if formatter is None:
+        return _fmt_generic(tool_name, tool_input)
+    return formatter(tool_input)
 
 
 def format_tool_result(result: str, is_error: bool = False) -> str:
@@ -124,6 +169,20 @@ class GitHubReporter:
 
     BASE_URL = "https://api.github.com"
 
+    # Installation tokens are valid for one hour; count from when we received
+    # it, leaving margin for the request latency
+    TOKEN_LIFETIME = 3300
+
+    # Refresh in the background once the token has this long left
+    TOKEN_STALE_WINDOW = 180
+
+    # Updates arriving within this window are appended to the previous
+    # comment (one PATCH) instead of opening a new one
+    COMMENT_MERGE_WINDOW = 5.0
+
+    # Stay under GitHub's 65536 character comment limit when merging
+    MAX_COMMENT_LENGTH = 60000
+
     def __init__(self):
         """Initialize GitHub reporter from environment."""
         self.app_id = os.environ.get("GITHUB_APP_ID")
@@ -135,9 +194,61 @@ class GitHubReporter:
         # https://github.com/owner/repo.git -> owner/repo
         self.repo_full_name = self._extract_repo_name(self.repo_clone_url)
 
-        self._installation_id: Optional[int] = None
+        # The webhook passes the installation from the event payload; with it
+        # the /repos/{repo}/installation lookup is skipped ("0" means unknown)
+        self._installation_id: Optional[int] = int(os.environ.get("GITHUB_INSTALLATION_ID") or 0) or None
         self._installation_token: Optional[str] = None
-        self._token_expires_at: float = 0
+        self._token_expires_at: float = 0  # time.monotonic() deadline
+        self._token_lock = asyncio.Lock()  # One refresh shared by concurrent callers
+        self._sync_lock = threading.Lock()  # Same, for get_auth_token_sync threads
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Parse the PEM once; PyJWT would otherwise re-parse it per signature
+        self._signing_key = self._load_signing_key()
+
+        # Last issued app JWT (valid 10 minutes, reused for 8)
+        self._jwt: Optional[str] = None
+        self._jwt_reuse_until: float = 0
+
+        # Long-lived HTTP client (keep-alive + HTTP/2), created lazily on
+        # the event loop that first uses it
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Last comment opened by post_or_update_comment, for merging
+        self._last_comment_id: Optional[int] = None
+        self._last_comment_body: str = ""
+        self._last_comment_time: float = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get or create the shared async HTTP client for the running loop.
+
+        Raises:
+            RuntimeError: If the client was created on a different event loop
+                and has not been closed with aclose()
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            # Its pooled connections belong to the other loop and cannot be
+            # closed from here; silently replacing it would leak them
+            raise RuntimeError("GitHub client is bound to another event loop; call aclose() first")
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                http2=True,
+                timeout=10.0,
+                headers=GITHUB_API_HEADERS,
+            )
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
 
     def _extract_repo_name(self, clone_url: str) -> str:
         """Extract owner/repo from clone URL."""
@@ -145,75 +256,123 @@ class GitHubReporter:
             return ""
 
         # Remove .git suffix
-        url = clone_url.rstrip("/")
-        if url.endswith(".git"):
-            url = url[:-4]
+        url = clone_url.rstrip("/").removesuffix(".git")
 
-        # Extract owner/repo
-        parts = url.split("/")
-        if len(parts) >= 2:
-            return f"{parts[-2]}/{parts[-1]}"
+        # Extract owner/repo from the last two path segments
+        rest, _, repo = url.rpartition("/")
+        owner = rest.rpartition("/")[2]
+        if owner and repo:
+            return f"{owner}/{repo}"
 
         return ""
 
+    def _load_signing_key(self):
+        """Load the GitHub App private key, falling back to the raw PEM."""
+        if not self.private_key:
+            return self.private_key
+        try:
+            return serialization.load_pem_private_key(self.private_key.encode(), password=None)
+        except Exception as e:
+            logger.warning(f"Could not pre-load GitHub App private key: {e}")
+            return self.private_key
+
     def _generate_jwt(self) -> str:
-        """Generate JWT for GitHub App authentication."""
+        """Generate JWT for GitHub App authentication (cached for 8 minutes)."""
         now = int(time.time())
+        if self._jwt and now < self._jwt_reuse_until:
+            return self._jwt
+
         payload = {
             "iat": now - 60,
             "exp": now + 600,
             "iss": self.app_id
         }
-        return jwt.encode(payload, self.private_key, algorithm="RS256")
+        self._jwt = jwt.encode(payload, self._signing_key, algorithm="RS256")
+        self._jwt_reuse_until = now + 480
+        return self._jwt
+
+    async def _get_installation_id(self, jwt_token: Optional[str] = None) -> int:
+        """
+        Get installation ID for the repository.
 
-    async def _get_installation_id(self) -> int:
-        """Get installation ID for the repository."""
+        Args:
+            jwt_token: App JWT to authenticate with (generated if omitted)
+        """
         if self._installation_id:
             return self._installation_id
 
-        jwt_token = self._generate_jwt()
-        headers = {
-            "Authorization": f"Bearer {jwt_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+        if jwt_token is None:
+            jwt_token = self._generate_jwt()
 
         # Get repository installation
-        url = f"{self.BASE_URL}/repos/{self.repo_full_name}/installation"
-        response = requests.get(url, headers=headers)
+        response = await self._get_client().get(
+            f"/repos/{self.repo_full_name}/installation",
+            headers={"Authorization": f"Bearer {jwt_token}"},
+        )
         response.raise_for_status()
 
         self._installation_id = response.json()["id"]
         logger.info(f"Got installation ID: {self._installation_id}")
         return self._installation_id
 
+    def _token_is_fresh(self, margin: float = 60) -> bool:
+        """Whether the cached installation token is valid for at least `margin` more seconds."""
+        return bool(self._installation_token) and time.monotonic() < self._token_expires_at - margin
+
     async def _get_token(self) -> str:
-        """Get or refresh installation access token."""
-        if self._installation_token and time.time() < self._token_expires_at - 60:
+        """
+        Get or refresh installation access token.
+
+        A token close to expiry (within TOKEN_STALE_WINDOW) is still returned
+        immediately while a replacement is fetched in the background; callers
+        only wait on the network once the token is actually unusable.
+        """
+        if self._token_is_fresh(self.TOKEN_STALE_WINDOW):
             return self._installation_token
 
-        installation_id = await self._get_installation_id()
-        jwt_token = self._generate_jwt()
+        if self._token_is_fresh():
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_in_background())
+            return self._installation_token
 
-        url = f"{self.BASE_URL}/app/installations/{installation_id}/access_tokens"
-        headers = {
-            "Authorization": f"Bearer {jwt_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+        return await self._refresh_token()
 
-        response = requests.post(url, headers=headers)
-        response.raise_for_status()
+    async def _refresh_in_background(self) -> None:
+        """Refresh a stale token without failing the caller that noticed it."""
+        try:
+            await self._refresh_token(margin=self.TOKEN_STALE_WINDOW)
+        except Exception as e:
+            logger.warning(f"Background token refresh failed: {e}")
 
-        data = response.json()
-        self._installation_token = data["token"]
+    async def _refresh_token(self, margin: float = 60) -> str:
+        """
+        Fetch a new installation access token.
 
-        from datetime import datetime
-        expires_at = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00"))
-        self._token_expires_at = expires_at.timestamp()
+        Args:
+            margin: Skip the fetch if, once the lock is held, the token is
+                valid for at least this many seconds (refreshed by another caller)
+        """
+        async with self._token_lock:
+            if self._token_is_fresh(margin):
+                return self._installation_token
+
+            # One JWT serves both the installation lookup and the token request
+            jwt_token = self._generate_jwt()
+            installation_id = await self._get_installation_id(jwt_token)
+
+            response = await self._get_client().post(
+                f"/app/installations/{installation_id}/access_tokens",
+                headers={"Authorization": f"Bearer {jwt_token}"},
+            )
+            response.raise_for_status()
 
-        logger.info(f"Got new installation token, expires at {data['expires_at']}")
-        return self._installation_token
+            data = response.json()
+            self._installation_token = data["token"]
+
+            self._token_expires_at = time.monotonic() + self.TOKEN_LIFETIME
+
+            logger.info(f"Got new installation token, expires at {data['expires_at']}")
+            return self._installation_token
 
     async def post_comment(self, body: str) -> Optional[dict]:
         """
@@ -231,24 +390,84 @@ class GitHubReporter:
 
         try:
             token = await self._get_token()
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28"
-            }
 
-            url = f"{self.BASE_URL}/repos/{self.repo_full_name}/issues/{self.pr_number}/comments"
-
-            response = requests.post(url, headers=headers, json={"body": body})
+            response = await self._get_client().post(
+                f"/repos/{self.repo_full_name}/issues/{self.pr_number}/comments",
+                headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+                content=orjson.dumps({"body": body}),
+            )
             response.raise_for_status()
 
+            # Later merged updates must not be appended above this comment
+            self._last_comment_id = None
+
             logger.info(f"Posted comment to PR #{self.pr_number}")
             return response.json()
 
-        except Exception as e:
-            logger.exception(f"Failed to post comment: {e}")
+        except Exception:
+            logger.exception("Failed to post comment")
             return None
 
+    async def post_or_update_comment(self, body: str, header: str = "") -> Optional[dict]:
+        """
+        Post a comment, or append to the previous one if it is recent.
+
+        Chatty progress updates arriving within COMMENT_MERGE_WINDOW of the
+        last one are merged into that comment with a PATCH rather than
+        opening a new comment each time.
+
+        Args:
+            body: Comment body (markdown)
+            header: Text placed once at the top of a newly created comment
+
+        Returns:
+            Created or updated comment data, or None on failure
+        """
+        if not self.repo_full_name or not self.pr_number:
+            logger.warning("Missing repo or PR number, cannot post comment")
+            return None
+
+        merged = f"{self._last_comment_body}\n\n---\n\n{body}"
+        if (
+            self._last_comment_id is None
+            or time.monotonic() - self._last_comment_time >= self.COMMENT_MERGE_WINDOW
+            or len(merged) > self.MAX_COMMENT_LENGTH
+        ):
+            return await self._post_mergeable_comment(f"{header}{body}")
+
+        try:
+            token = await self._get_token()
+
+            response = await self._get_client().patch(
+                f"/repos/{self.repo_full_name}/issues/comments/{self._last_comment_id}",
+                headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+                content=orjson.dumps({"body": merged}),
+            )
+            response.raise_for_status()
+
+            self._last_comment_body = merged
+            self._last_comment_time = time.monotonic()
+
+            logger.info(f"Updated comment {self._last_comment_id} on PR #{self.pr_number}")
+            return response.json()
+
+        except Exception:
+            # Comment deleted (404), rejected (422) or network error - post
+            # the update as a fresh comment instead of dropping it
+            logger.exception("Failed to update comment, posting a new one")
+            self._last_comment_id = None
+
+        return await self._post_mergeable_comment(f"{header}{body}")
+
+    async def _post_mergeable_comment(self, body: str) -> Optional[dict]:
+        """Post a new comment that later post_or_update_comment calls may merge into."""
+        comment = await self.post_comment(body)
+        if comment is not None:
+            self._last_comment_id = comment["id"]
+            self._last_comment_body = body
+            self._last_comment_time = time.monotonic()
+        return comment
+
     async def update_pr_body(self, body: str) -> Optional[dict]:
         """
         Update the PR body.
@@ -261,46 +480,86 @@ class GitHubReporter:
         """
         try:
             token = await self._get_token()
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28"
-            }
 
-            url = f"{self.BASE_URL}/repos/{self.repo_full_name}/pulls/{self.pr_number}"
-
-            response = requests.patch(url, headers=headers, json={"body": body})
+            response = await self._get_client().patch(
+                f"/repos/{self.repo_full_name}/pulls/{self.pr_number}",
+                headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+                content=orjson.dumps({"body": body}),
+            )
             response.raise_for_status()
 
             logger.info(f"Updated PR #{self.pr_number} body")
             return response.json()
 
-        except Exception as e:
-            logger.exception(f"Failed to update PR: {e}")
+        except Exception:
+            logger.exception("Failed to update PR")
             return None
 
     def get_auth_token_sync(self) -> Optional[str]:
         """
         Get authentication token synchronously (for git operations).
 
+        Returns the cached token while it is valid; otherwise fetches one
+        with a blocking HTTP call, so call it from a worker thread rather
+        than the event loop.
+
         Returns:
             Installation token or None
         """
-        import asyncio
+        if self._token_is_fresh():
+            return self._installation_token
 
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Create a new loop in a thread
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self._get_token())
-                    return future.result()
-            else:
-                return loop.run_until_complete(self._get_token())
-        except Exception as e:
-            logger.exception(f"Failed to get token: {e}")
-            return None
+        with self._sync_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token_is_fresh():
+                return self._installation_token
+            try:
+                return self._refresh_token_sync()
+            except Exception:
+                logger.exception("Failed to get token")
+                return None
+
+    def _refresh_token_sync(self) -> str:
+        """Fetch a new installation access token with blocking requests (pooled session)."""
+        jwt_token = self._generate_jwt()
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+
+        if not self._installation_id:
+            response = _SESSION.get(
+                f"{self.BASE_URL}/repos/{self.repo_full_name}/installation",
+                headers=headers,
+                timeout=10,
+            )
+            response.raise_for_status()
+            self._installation_id = response.json()["id"]
+            logger.info(f"Got installation ID: {self._installation_id}")
+
+        response = _SESSION.post(
+            f"{self.BASE_URL}/app/installations/{self._installation_id}/access_tokens",
+            headers=headers,
+            timeout=10,
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        self._installation_token = data["token"]
+        self._token_expires_at = time.monotonic() + self.TOKEN_LIFETIME
+
+        logger.info(f"Got new installation token, expires at {data['expires_at']}")
+        return self._installation_token
+
+
+# Process-wide reporter, so the JWT, installation token and HTTP client
+# caches are shared by every caller
+_reporter: Optional[GitHubReporter] = None
+
+
+def get_reporter() -> GitHubReporter:
+    """Get the shared GitHubReporter (use this rather than GitHubReporter())."""
+    global _reporter
+    if _reporter is None:
+        _reporter = GitHubReporter()
+    return _reporter
 
 
 class StreamingReporter:
@@ -309,7 +568,8 @@ class StreamingReporter:
 
     Groups related items:
     - Claude's text responses → posted immediately as separate comments
-    - Tool use + result → grouped together in same comment
+    - Tool use + result → grouped together in same comment (bursts of
+      tool activity are merged into the previous tool comment)
     - Consecutive similar tools (reads) → batched with their results
     """
 
@@ -322,6 +582,14 @@ class StreamingReporter:
     # Maximum items in a batch before forcing a post
     MAX_BATCH_SIZE = 6
 
+    # The post worker waits this long after an update so a burst of them
+    # goes out as one comment, up to MAX_COALESCED_CHARS per post
+    COALESCE_WINDOW = 0.5
+    MAX_COALESCED_CHARS = 30000
+
+    # Hidden marker identifying stream comments
+    STREAM_MARKER = "<!-- claude-agent-stream -->\n"
+
     def __init__(self, github: GitHubReporter):
         """
         Initialize streaming reporter.
@@ -330,11 +598,17 @@ class StreamingReporter:
             github: GitHubReporter instance for posting
         """
         self.github = github
-        self._pending_tool_uses: list[tuple[str, str]] = []  # [(tool_name, formatted), ...]
-        self._pending_results: list[str] = []  # [formatted_result, ...]
+        # Pending state is only touched between awaits on the event loop,
+        # so producers append without taking a lock
+        self._pending_tool_uses: deque[str] = deque()  # [formatted_tool_use, ...]
+        self._pending_results: deque[str] = deque()  # [formatted_result, ...]
         self._batch_mode: bool = False  # True when collecting batch tools
         self._last_post_time: float = 0
-        self._lock = asyncio.Lock()
+
+        # Comments waiting to be posted as (body, merge), drained by a single
+        # worker so producers never wait on the GitHub round trip
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
 
     async def _rate_limit_wait(self) -> None:
         """Wait if needed to avoid rate limiting."""
@@ -342,21 +616,78 @@ class StreamingReporter:
         if elapsed < self.MIN_POST_INTERVAL:
             await asyncio.sleep(self.MIN_POST_INTERVAL - elapsed)
 
-    async def _post(self, body: str) -> None:
-        """Post a comment with rate limiting."""
+    async def _post(self, body: str, merge: bool = True) -> None:
+        """
+        Post a comment with rate limiting.
+
+        Args:
+            body: Comment body (markdown)
+            merge: Append to the previous stream comment if it is recent
+        """
         await self._rate_limit_wait()
-        await self.github.post_comment(f"<!-- claude-agent-stream -->\n{body}")
+        if merge:
+            await self.github.post_or_update_comment(body, header=self.STREAM_MARKER)
+        else:
+            await self.github.post_comment(f"{self.STREAM_MARKER}{body}")
         self._last_post_time = time.time()
 
+    def _enqueue(self, body: str, merge: bool = True) -> None:
+        """Queue a comment for the post worker, starting it if needed."""
+        self._queue.put_nowait((body, merge))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._post_worker())
+
+    async def _post_worker(self) -> None:
+        """Post queued comments in order, coalescing bursts."""
+        while True:
+            items = [await self._queue.get()]
+
+            # Let the rest of a burst arrive, then take everything queued
+            await asyncio.sleep(self.COALESCE_WINDOW)
+            while not self._queue.empty():
+                items.append(self._queue.get_nowait())
+
+            try:
+                for body, merge in self._coalesce(items):
+                    try:
+                        await self._post(body, merge)
+                    except Exception as e:
+                        logger.warning(f"Failed to post stream update: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _coalesce(self, items: list[tuple[str, bool]]) -> list[tuple[str, bool]]:
+        """
+        Join consecutive mergeable updates into combined posts.
+
+        Updates that must stand alone (merge=False) keep their place in the
+        order; a combined post is cut once it would exceed MAX_COALESCED_CHARS.
+        """
+        posts: list[tuple[str, bool]] = []
+        group: list[str] = []
+        size = 0
+        for body, merge in items:
+            if group and (not merge or size + len(body) > self.MAX_COALESCED_CHARS):
+                posts.append(("\n\n---\n\n".join(group), True))
+                group, size = [], 0
+            if merge:
+                group.append(body)
+                size += len(body)
+            else:
+                posts.append((body, False))
+        if group:
+            posts.append(("\n\n---\n\n".join(group), True))
+        return posts
+
     async def add_text(self, text: str) -> None:
         """Post Claude's text response immediately as its own comment."""
-        async with self._lock:
-            # Flush any pending items first
-            await self._flush_pending()
+        # Flush any pending items first
+        self._flush_pending()
 
-            # Post text immediately
-            formatted = format_text_response(text)
-            await self._post(formatted)
+        # Post text immediately
+        formatted = format_text_response(text)
+        self._enqueue(formatted, merge=False)
 
     async def add_tool_use(self, tool_name: str, tool_input: dict[str, Any]) -> None:
         """
@@ -367,23 +698,22 @@ class StreamingReporter:
         """
         formatted = format_tool_use(tool_name, tool_input)
 
-        async with self._lock:
-            if tool_name in self.BATCH_TOOLS:
-                # If we were not in batch mode and have pending items, flush first
-                if not self._batch_mode and self._pending_tool_uses:
-                    await self._flush_pending()
+        if tool_name in self.BATCH_TOOLS:
+            # If we were not in batch mode and have pending items, flush first
+            if not self._batch_mode and self._pending_tool_uses:
+                self._flush_pending()
 
-                self._batch_mode = True
-                self._pending_tool_uses.append((tool_name, formatted))
+            self._batch_mode = True
+            self._pending_tool_uses.append(formatted)
 
-                # Flush if batch gets too large
-                if len(self._pending_tool_uses) >= self.MAX_BATCH_SIZE:
-                    await self._flush_pending()
-            else:
-                # Non-batchable tool - flush any batch and start fresh
-                await self._flush_pending()
-                self._batch_mode = False
-                self._pending_tool_uses.append((tool_name, formatted))
+            # Flush if batch gets too large
+            if len(self._pending_tool_uses) >= self.MAX_BATCH_SIZE:
+                self._flush_pending()
+        else:
+            # Non-batchable tool - flush any batch and start fresh
+            self._flush_pending()
+            self._batch_mode = False
+            self._pending_tool_uses.append(formatted)
 
     async def add_tool_result(self, result: str, is_error: bool = False) -> None:
         """
@@ -394,48 +724,52 @@ class StreamingReporter:
         """
         formatted = format_tool_result(result, is_error)
 
-        async with self._lock:
-            self._pending_results.append(formatted)
+        self._pending_results.append(formatted)
 
-            # Check if we have results for all pending tool uses
-            if len(self._pending_results) >= len(self._pending_tool_uses):
-                await self._flush_pending()
+        # Check if we have results for all pending tool uses
+        if len(self._pending_results) >= len(self._pending_tool_uses):
+            self._flush_pending()
 
-    async def _flush_pending(self) -> None:
-        """Flush pending tool uses paired with their results."""
+    def _flush_pending(self) -> None:
+        """Queue pending tool uses paired with their results for posting."""
         if not self._pending_tool_uses:
             # Just orphaned results
             if self._pending_results:
                 body = "\n\n---\n\n".join(self._pending_results)
-                self._pending_results = []
-                await self._post(body)
+                self._pending_results.clear()
+                self._enqueue(body)
             return
 
-        # Pair each tool use with its result
-        parts = []
-        for i, (tool_name, tool_formatted) in enumerate(self._pending_tool_uses):
-            if i < len(self._pending_results):
-                # Pair tool use with result
-                parts.append(f"{tool_formatted}\n\n{self._pending_results[i]}")
-            else:
-                # No result yet - just show tool use
-                parts.append(tool_formatted)
-
-        # Handle any extra results (shouldn't happen)
-        for i in range(len(self._pending_tool_uses), len(self._pending_results)):
-            parts.append(self._pending_results[i])
+        # Pair each tool use with its result; a tool use without a result
+        # yet is shown alone, as is any extra result (shouldn't happen)
+        parts = [
+            result if tool_formatted is None
+            else tool_formatted if result is None
+            else f"{tool_formatted}\n\n{result}"
+            for tool_formatted, result in zip_longest(
+                self._pending_tool_uses,
+                self._pending_results,
+            )
+        ]
 
         # Clear pending
-        self._pending_tool_uses = []
-        self._pending_results = []
+        self._pending_tool_uses.clear()
+        self._pending_results.clear()
         self._batch_mode = False
 
         # Post combined comment
         if parts:
             body = "\n\n---\n\n".join(parts)
-            await self._post(body)
+            self._enqueue(body)
 
     async def flush(self) -> None:
-        """Force post any remaining items."""
-        async with self._lock:
-            await self._flush_pending()
+        """Force post any remaining items and wait until they are posted."""
+        self._flush_pending()
+
+        try:
+            await self._queue.join()
+        finally:
+            # Stop the worker even if the wait is cancelled
+            if self._worker is not None:
+                self._worker.cancel()
+                self._worker = None
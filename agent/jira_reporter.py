@@ -5,16 +5,124 @@ Posts summary comments back to JIRA issues when agent work completes.
 Fetches credentials from AWS Secrets Manager.
 """
 
+import asyncio
 import json
 import logging
 import os
+import threading
+import time
 from typing import Optional
 
-import boto3
-import requests
+import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Secrets are cached process-wide for SECRET_TTL seconds. Past half the TTL
+# a cached value is still returned while one background thread refreshes it
+SECRET_TTL = 600
+_SECRET_CACHE: dict[str, tuple[dict, float]] = {}  # arn -> (secret, fetched at)
+_SECRET_REFRESHING: set[str] = set()
+_SECRET_LOCK = threading.Lock()
+
+# Constant ADF paragraphs reused by every completion summary
+_SUCCESS_HEADER = {
+    "type": "paragraph",
+    "content": [
+        {"type": "text", "text": "✅ Implementation Complete", "marks": [{"type": "strong"}]}
+    ]
+}
+_FAILURE_HEADER = {
+    "type": "paragraph",
+    "content": [
+        {"type": "text", "text": "⚠️ Implementation Failed", "marks": [{"type": "strong"}]}
+    ]
+}
+_COMMITS_HEADING = {
+    "type": "paragraph",
+    "content": [
+        {"type": "text", "text": "Commits:", "marks": [{"type": "strong"}]}
+    ]
+}
+_FOOTER = {
+    "type": "paragraph",
+    "content": [
+        {
+            "type": "text",
+            "text": "Review the PR and provide feedback there.",
+            "marks": [{"type": "em"}]
+        }
+    ]
+}
+
+# Shared Secrets Manager client (building one loads the service model)
+_sm_client = None
+_sm_lock = threading.Lock()
+
+
+def get_secrets_client():
+    """Get the process-wide boto3 secrets manager client."""
+    global _sm_client
+    if _sm_client is None:
+        with _sm_lock:
+            if _sm_client is None:
+                import boto3  # Deferred: only JIRA-triggered sessions need it
+                _sm_client = boto3.client("secretsmanager")
+    return _sm_client
+
+
+def _fetch_secret(secret_arn: str) -> dict:
+    """Fetch a JSON secret from Secrets Manager and cache it."""
+    response = get_secrets_client().get_secret_value(SecretId=secret_arn)
+    secret = json.loads(response["SecretString"])
+    _SECRET_CACHE[secret_arn] = (secret, time.monotonic())
+    return secret
+
+
+def _refresh_secret(secret_arn: str) -> None:
+    """Background refresh of a stale cached secret."""
+    try:
+        _fetch_secret(secret_arn)
+    except Exception as e:
+        logger.warning(f"Failed to refresh secret {secret_arn}: {e}")
+    finally:
+        with _SECRET_LOCK:
+            _SECRET_REFRESHING.discard(secret_arn)
+
+
+def get_cached_secret(secret_arn: str) -> dict:
+    """
+    Get a JSON secret, served from the process-wide cache when possible.
+
+    Args:
+        secret_arn: Secrets Manager secret ARN
+
+    Returns:
+        Parsed secret
+    """
+    cached = _SECRET_CACHE.get(secret_arn)
+    if cached is not None:
+        secret, fetched_at = cached
+        age = time.monotonic() - fetched_at
+        if age < SECRET_TTL / 2:
+            return secret
+        if age < SECRET_TTL:
+            with _SECRET_LOCK:
+                start = secret_arn not in _SECRET_REFRESHING
+                _SECRET_REFRESHING.add(secret_arn)
+            if start:
+                threading.Thread(
+                    target=_refresh_secret, args=(secret_arn,), daemon=True
+                ).start()
+            return secret
+
+    # Missing or expired: fetch once, letting concurrent callers share it
+    with _SECRET_LOCK:
+        cached = _SECRET_CACHE.get(secret_arn)
+        if cached is not None and time.monotonic() - cached[1] < SECRET_TTL:
+            return cached[0]
+        return _fetch_secret(secret_arn)
+
 
 class JiraReporter:
     """
@@ -30,9 +138,13 @@ class JiraReporter:
         self.secret_arn = os.environ.get("JIRA_SECRET_ARN", "")
         self.pr_number = os.environ.get("PR_NUMBER", "")
         self.repo_full_name = self._get_repo_full_name()
+        self.pr_url = f"https://github.com/{self.repo_full_name}/pull/{self.pr_number}"
+
+        # Whether JIRA reporting is enabled (has necessary config)
+        self.enabled = bool(self.issue_key and self.secret_arn)
 
-        self._credentials: Optional[dict] = None
-        self._secrets_client = None
+        # Long-lived HTTP client (keep-alive + HTTP/2), created on first use
+        self._client: Optional[httpx.AsyncClient] = None
 
     def _get_repo_full_name(self) -> str:
         """Extract repo full name from environment."""
@@ -53,31 +165,15 @@ class JiraReporter:
 
         return ""
 
-    @property
-    def enabled(self) -> bool:
-        """Check if JIRA reporting is enabled (has necessary config)."""
-        return bool(self.issue_key and self.secret_arn)
-
     def _get_credentials(self) -> dict:
-        """Fetch JIRA credentials from Secrets Manager."""
-        if self._credentials:
-            return self._credentials
-
+        """Fetch JIRA credentials from Secrets Manager (cached process-wide)."""
         if not self.secret_arn:
             raise ValueError("JIRA_SECRET_ARN not configured")
 
-        if self._secrets_client is None:
-            self._secrets_client = boto3.client("secretsmanager")
+        return get_cached_secret(self.secret_arn)
 
-        response = self._secrets_client.get_secret_value(SecretId=self.secret_arn)
-        self._credentials = json.loads(response["SecretString"])
-
-        logger.info("Fetched JIRA credentials from Secrets Manager")
-        return self._credentials
-
-    def _get_base_url(self) -> str:
+    def _get_base_url(self, creds: dict) -> str:
         """Get JIRA base URL from credentials or site."""
-        creds = self._get_credentials()
         base_url = creds.get("base_url", "")
 
         if not base_url and self.site:
@@ -85,23 +181,39 @@ class JiraReporter:
 
         return base_url.rstrip("/")
 
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> dict:
-        """Make an authenticated API request to JIRA."""
-        creds = self._get_credentials()
-        base_url = self._get_base_url()
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get or create the authenticated JIRA API client.
+
+        Credentials, base URL and auth are resolved once, when the client
+        is created; later requests only pay for the HTTP call.
+        """
+        if self._client is None:
+            # Secrets Manager lookup is blocking; keep it off the event loop
+            creds = await asyncio.to_thread(self._get_credentials)
+            base_url = self._get_base_url(creds)
+
+            self._client = httpx.AsyncClient(
+                base_url=f"{base_url}/rest/api/3",
+                auth=(creds["email"], creds["api_token"]),
+                http2=True,
+                timeout=10.0,
+                headers={"Content-Type": "application/json"},
+            )
+        return self._client
 
-        url = f"{base_url}/rest/api/3{endpoint}"
-        auth = (creds["email"], creds["api_token"])
+    async def aclose(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-        headers = kwargs.pop("headers", {})
-        headers["Content-Type"] = "application/json"
+    async def _make_request(self, method: str, endpoint: str, json_body: Optional[dict] = None) -> dict:
+        """Make an authenticated API request to JIRA, encoding the body with orjson."""
+        client = await self._get_client()
 
-        response = requests.request(
-            method, url,
-            auth=auth,
-            headers=headers,
-            **kwargs
-        )
+        content = orjson.dumps(json_body) if json_body is not None else None
+        response = await client.request(method, endpoint, content=content)
         response.raise_for_status()
         return response.json() if response.content else {}
 
@@ -129,23 +241,9 @@ class JiraReporter:
             return None
 
         try:
-            pr_url = f"https://github.com/{self.repo_full_name}/pull/{self.pr_number}"
-
-            if success:
-                status_icon = "✅"
-                status_text = "Implementation Complete"
-            else:
-                status_icon = "⚠️"
-                status_text = "Implementation Failed"
-
             # Build ADF content
             content = [
-                {
-                    "type": "paragraph",
-                    "content": [
-                        {"type": "text", "text": f"{status_icon} {status_text}", "marks": [{"type": "strong"}]}
-                    ]
-                },
+                _SUCCESS_HEADER if success else _FAILURE_HEADER,
                 {
                     "type": "paragraph",
                     "content": [
@@ -156,7 +254,7 @@ class JiraReporter:
                             "marks": [
                                 {
                                     "type": "link",
-                                    "attrs": {"href": pr_url}
+                                    "attrs": {"href": self.pr_url}
                                 }
                             ]
                         }
@@ -176,30 +274,24 @@ class JiraReporter:
 
             # Add commits as bullet list
             if commits:
-                commit_items = []
-                for commit in commits[-5:]:  # Last 5 commits
-                    commit_items.append({
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [
-                                    {"type": "text", "text": commit, "marks": [{"type": "code"}]}
-                                ]
-                            }
-                        ]
-                    })
-
+                content.append(_COMMITS_HEADING)
                 content.append({
-                    "type": "paragraph",
+                    "type": "bulletList",
                     "content": [
-                        {"type": "text", "text": "Commits:", "marks": [{"type": "strong"}]}
+                        {
+                            "type": "listItem",
+                            "content": [
+                                {
+                                    "type": "paragraph",
+                                    "content": [
+                                        {"type": "text", "text": commit, "marks": [{"type": "code"}]}
+                                    ]
+                                }
+                            ]
+                        }
+                        for commit in commits[-5:]  # Last 5 commits
                     ]
                 })
-                content.append({
-                    "type": "bulletList",
-                    "content": commit_items
-                })
 
             # Add error if present
             if error:
@@ -212,16 +304,7 @@ class JiraReporter:
                 })
 
             # Add footer
-            content.append({
-                "type": "paragraph",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": "Review the PR and provide feedback there.",
-                        "marks": [{"type": "em"}]
-                    }
-                ]
-            })
+            content.append(_FOOTER)
 
             adf_body = {
                 "type": "doc",
@@ -230,10 +313,10 @@ class JiraReporter:
             }
 
             logger.info(f"Posting completion summary to JIRA issue {self.issue_key}")
-            result = self._make_request(
+            result = await self._make_request(
                 "POST",
                 f"/issue/{self.issue_key}/comment",
-                json={"body": adf_body}
+                json_body={"body": adf_body}
             )
 
             logger.info(f"Posted completion summary to JIRA {self.issue_key}")
@@ -19,11 +19,12 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 
 import uvicorn
+import uvloop
 
 from api_server import app, prompt_queue
 from claude_runner import ClaudeRunner
 from session_reporter import SessionReporter
-from github_reporter import GitHubReporter, StreamingReporter
+from github_reporter import GitHubReporter, StreamingReporter, get_reporter
 from jira_reporter import JiraReporter
 from dev_server import DevServerManager
 
@@ -49,9 +50,27 @@ IDLE_TIMEOUT_SECONDS = 60 * 60
 IDLE_WARNING_SECONDS = 55 * 60  # Warn 5 minutes before timeout
 
 # Global state
-last_activity_time = time.time()
+last_activity_time = time.monotonic()  # Monotonic: only used for idle arithmetic
 shutdown_requested = False
 
+# Set on each prompt arrival (and on shutdown) so the idle monitor
+# recomputes its deadline instead of polling every minute
+activity_event = asyncio.Event()
+
+# Pushed onto the prompt queue to wake process_prompts on shutdown
+SHUTDOWN_SENTINEL = {"__shutdown__": True}
+
+
+def request_shutdown() -> None:
+    """Flag shutdown and wake the prompt loop and idle monitor."""
+    global shutdown_requested
+    shutdown_requested = True
+    activity_event.set()
+    try:
+        prompt_queue.put_nowait(SHUTDOWN_SENTINEL)
+    except asyncio.QueueFull:
+        pass  # process_prompts checks shutdown_requested on its next item
+
 
 def get_workspace_path() -> str:
     """Get path to the cloned repository."""
@@ -65,7 +84,13 @@ async def run_api_server():
         app,
         host="0.0.0.0",
         port=3000,  # ALB routes here; we proxy dev server requests to 3001
-        log_level="info"
+        # Every proxied UAT request and health probe would otherwise be
+        # written to the access log
+        log_level="warning",
+        access_log=False,
+        loop="uvloop",
+        http="httptools",
+        backlog=256,
     )
     server = uvicorn.Server(config)
     await server.serve()
@@ -83,15 +108,18 @@ async def process_prompts(
     """
     global last_activity_time
 
-    while not shutdown_requested:
-        try:
-            # Wait for prompt with timeout
-            prompt_data = await asyncio.wait_for(
-                prompt_queue.get(),
-                timeout=10.0
-            )
+    while True:
+        # request_shutdown() pushes a sentinel, so no timeout is needed
+        prompt_data = await prompt_queue.get()
+        if shutdown_requested or prompt_data.get("__shutdown__"):
+            prompt_queue.task_done()
+            break
 
-            last_activity_time = time.time()
+        # Prompts are handled one at a time: they are follow-ups on the same
+        # branch and continue the same Claude conversation
+        try:
+            last_activity_time = time.monotonic()
+            activity_event.set()
             logger.info(f"Processing prompt from {prompt_data.get('author', 'unknown')}")
 
             prompt = prompt_data.get("prompt", "")
@@ -106,15 +134,17 @@ async def process_prompts(
             streamer = StreamingReporter(github)
 
             # Run Claude Code with streaming callbacks
-            result = await claude.run_prompt(
-                prompt,
-                on_tool_use=streamer.add_tool_use,
-                on_tool_result=streamer.add_tool_result,
-                on_text=streamer.add_text,
-            )
-
-            # Flush any remaining updates
-            await streamer.flush()
+            try:
+                result = await claude.run_prompt(
+                    prompt,
+                    on_tool_use=streamer.add_tool_use,
+                    on_tool_result=streamer.add_tool_result,
+                    on_text=streamer.add_text,
+                )
+            finally:
+                # Flush any remaining updates and stop the post worker,
+                # even if the run raised
+                await streamer.flush()
 
             # Post final result
             if result["success"]:
@@ -134,31 +164,41 @@ async def process_prompts(
                 )
 
             # Update session activity
-            session.update_activity()
+            await session.update_activity_async()
 
-        except asyncio.TimeoutError:
-            # No prompt received, check for idle timeout
-            continue
         except Exception as e:
             logger.exception(f"Error processing prompt: {e}")
+        finally:
+            prompt_queue.task_done()
 
 
 async def check_idle_timeout(github: GitHubReporter):
     """
     Monitor for idle timeout.
 
-    Posts warning and shuts down if idle too long.
+    Posts warning and shuts down if idle too long. Sleeps until the next
+    deadline rather than waking up every minute; activity_event cuts the
+    sleep short when a prompt arrives.
     """
-    global shutdown_requested
     warning_posted = False
 
     while not shutdown_requested:
-        await asyncio.sleep(60)  # Check every minute
-
-        idle_time = time.time() - last_activity_time
+        idle_time = time.monotonic() - last_activity_time
+        if warning_posted and idle_time < IDLE_WARNING_SECONDS:
+            # Activity since the warning - start over
+            warning_posted = False
+
+        deadline = IDLE_TIMEOUT_SECONDS if warning_posted else IDLE_WARNING_SECONDS
+        if idle_time < deadline:
+            activity_event.clear()
+            try:
+                await asyncio.wait_for(activity_event.wait(), timeout=deadline - idle_time)
+            except asyncio.TimeoutError:
+                pass
+            continue
 
         # Post warning
-        if idle_time > IDLE_WARNING_SECONDS and not warning_posted:
+        if not warning_posted:
             await github.post_comment(
                 f"<!-- claude-agent -->\n:hourglass: **Idle Warning**\n\nNo activity for {int(idle_time / 60)} minutes. "
                 f"Session will terminate in {int((IDLE_TIMEOUT_SECONDS - idle_time) / 60)} minutes.\n\n"
@@ -166,17 +206,17 @@ async def check_idle_timeout(github: GitHubReporter):
             )
             warning_posted = True
             logger.warning(f"Posted idle warning, idle for {idle_time}s")
+            continue
 
         # Shutdown on timeout
-        if idle_time > IDLE_TIMEOUT_SECONDS:
-            logger.warning(f"Idle timeout reached ({idle_time}s), shutting down")
-            await github.post_comment(
-                f"<!-- claude-agent -->\n:zzz: **Session Terminated**\n\n"
-                f"No activity for {int(idle_time / 60)} minutes. Session has been terminated.\n\n"
-                f"To restart, remove and re-add the `claude-dev` label on the original issue."
-            )
-            shutdown_requested = True
-            break
+        logger.warning(f"Idle timeout reached ({idle_time}s), shutting down")
+        await github.post_comment(
+            f"<!-- claude-agent -->\n:zzz: **Session Terminated**\n\n"
+            f"No activity for {int(idle_time / 60)} minutes. Session has been terminated.\n\n"
+            f"To restart, remove and re-add the `claude-dev` label on the original issue."
+        )
+        request_shutdown()
+        break
 
 
 async def main():
@@ -189,62 +229,70 @@ async def main():
     logger.info(f"PR Number: {PR_NUMBER}")
     logger.info("=" * 60)
 
+    # Register signal handlers on the loop so request_shutdown() runs as a
+    # normal loop callback rather than re-entrantly inside loop code
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, handle_signal, sig)
+
     workspace = get_workspace_path()
     logger.info(f"Workspace: {workspace}")
 
     # Initialize components
     session = SessionReporter()
-    github = GitHubReporter()
+    github = get_reporter()
     jira = JiraReporter()
     claude = ClaudeRunner(workspace)
     dev_server = DevServerManager(workspace)
 
-    # Report IP and mark session as running
-    logger.info("Reporting container IP...")
-    container_ip = session.discover_and_report_ip()
-    uat_url = f"https://{SESSION_ID}.{UAT_DOMAIN_SUFFIX}"
+    # Start API server immediately so PR comments can be received during initial prompt processing
+    logger.info("Starting API server on port 3000...")
+    api_server_task = asyncio.create_task(run_api_server())
 
-    # Post UAT URL to PR
-    await github.post_comment(
-        f"<!-- claude-agent -->\n:rocket: **Agent Ready**\n\n"
-        f"Session ID: `{SESSION_ID}`\n"
-        f"UAT Preview: {uat_url}\n\n"
-        f"I'm starting work on this issue. Comment on this PR to provide feedback."
+    # The UAT URL only depends on the session ID, so reporting the IP,
+    # posting the ready comment and starting the dev server run concurrently
+    uat_url = f"https://{SESSION_ID}.{UAT_DOMAIN_SUFFIX}"
+    logger.info("Reporting container IP and starting dev server...")
+    container_ip, _, dev_server_started = await asyncio.gather(
+        # Marks the session as running
+        session.discover_and_report_ip_async(),
+        # Post UAT URL to PR
+        github.post_comment(
+            f"<!-- claude-agent -->\n:rocket: **Agent Ready**\n\n"
+            f"Session ID: `{SESSION_ID}`\n"
+            f"UAT Preview: {uat_url}\n\n"
+            f"I'm starting work on this issue. Comment on this PR to provide feedback."
+        ),
+        # Dev server runs on port 3001, proxied through API server on 3000
+        dev_server.start(),
     )
-
-    # Start dev server (on port 3001, proxied through API server on 3000)
-    logger.info("Starting dev server...")
-    dev_server_started = await dev_server.start()
     if dev_server_started:
         logger.info("Dev server started on port 3001 (proxied via API server on 3000)")
     else:
         logger.warning("Could not auto-detect dev server")
-
-    # Start API server immediately so PR comments can be received during initial prompt processing
-    logger.info("Starting API server on port 3000...")
-    api_server_task = asyncio.create_task(run_api_server())
-    # Give it a moment to start
-    await asyncio.sleep(0.5)
     logger.info("API server started, ready to receive prompts")
 
     # Process initial prompt
     if INITIAL_PROMPT:
         logger.info("Processing initial prompt...")
-        last_activity_time = time.time()
+        last_activity_time = time.monotonic()
+        activity_event.set()
 
         # Create streaming reporter for initial prompt
         streamer = StreamingReporter(github)
 
         # Run Claude Code with streaming callbacks
-        result = await claude.run_prompt(
-            INITIAL_PROMPT,
-            on_tool_use=streamer.add_tool_use,
-            on_tool_result=streamer.add_tool_result,
-            on_text=streamer.add_text,
-        )
-
-        # Flush any remaining updates
-        await streamer.flush()
+        try:
+            result = await claude.run_prompt(
+                INITIAL_PROMPT,
+                on_tool_use=streamer.add_tool_use,
+                on_tool_result=streamer.add_tool_result,
+                on_text=streamer.add_text,
+            )
+        finally:
+            # Flush any remaining updates and stop the post worker,
+            # even if the run raised
+            await streamer.flush()
 
         # Post final result
         if result["success"]:
@@ -286,22 +334,21 @@ async def main():
     finally:
         # Cleanup
         logger.info("Shutting down...")
-        dev_server.stop()
-        session.mark_completed()
+        await dev_server.stop()
+        if session.has_pending_activity:
+            await session.flush_activity_async()
+        await session.mark_completed_async()
+        await github.aclose()
+        await jira.aclose()
         logger.info("Agent terminated")
 
 
-def handle_signal(signum, frame):
-    """Handle shutdown signals."""
-    global shutdown_requested
+def handle_signal(signum: int) -> None:
+    """Handle shutdown signals (registered with loop.add_signal_handler)."""
     logger.info(f"Received signal {signum}, requesting shutdown")
-    shutdown_requested = True
+    request_shutdown()
 
 
 if __name__ == "__main__":
-    # Register signal handlers
-    signal.signal(signal.SIGTERM, handle_signal)
-    signal.signal(signal.SIGINT, handle_signal)
-
-    # Run main
-    asyncio.run(main())
+    # Run main on uvloop (libuv-backed event loop)
+    uvloop.run(main())
@@ -4,47 +4,63 @@ Session reporter for DynamoDB updates.
 Reports container IP and status to the sessions table.
 """
 
+import asyncio
+import atexit
 import logging
 import os
 import time
+from functools import cached_property
 from typing import Optional
 
-import boto3
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive session for the ECS metadata endpoint, so a retried lookup
+# reuses the connection instead of opening a new one
+_SESSION = requests.Session()
+atexit.register(_SESSION.close)
+
 
 class SessionReporter:
     """
     Reports session state to DynamoDB.
 
     Called by the agent container to:
-    1. Report its public IP when ready
+    1. Report its private IP when ready
     2. Update status transitions
     3. Record activity timestamps
     """
 
+    # Minimum seconds between last_activity writes; activity in between is
+    # held in memory and written by the next due update or flush_activity()
+    ACTIVITY_WRITE_INTERVAL = 30
+
     def __init__(self):
         """Initialize session reporter from environment."""
         self.session_id = os.environ.get("SESSION_ID", "")
         self.table_name = os.environ.get("SESSIONS_TABLE", "")
-        self._dynamodb = None
-        self._table = None
+        self._private_ip: Optional[str] = None  # Cached once discovered
+        self._last_activity_write: float = float("-inf")  # time.monotonic() of last write
+        self._pending_activity: Optional[int] = None  # Unwritten activity timestamp
 
-    @property
+    @cached_property
     def dynamodb(self):
         """Get DynamoDB resource."""
-        if self._dynamodb is None:
-            self._dynamodb = boto3.resource("dynamodb")
-        return self._dynamodb
+        # boto3 is slow to import; load it on first use, which happens
+        # in a worker thread via the *_async wrappers
+        import boto3
+        return boto3.resource("dynamodb")
 
-    @property
+    @cached_property
     def table(self):
         """Get DynamoDB table."""
-        if self._table is None:
-            self._table = self.dynamodb.Table(self.table_name)
-        return self._table
+        return self.dynamodb.Table(self.table_name)
+
+    @property
+    def has_pending_activity(self) -> bool:
+        """Whether update_activity() recorded activity not yet written."""
+        return self._pending_activity is not None
 
     def discover_private_ip(self) -> Optional[str]:
         """
@@ -52,27 +68,36 @@ class SessionReporter:
 
         Uses ECS metadata endpoint to get the container's private IP address,
         which is required for security group-based access from the UAT proxy.
+        The address does not change for the life of the task, so the first
+        successful lookup is cached.
 
         Returns:
             Private IP address or None
         """
+        if self._private_ip:
+            return self._private_ip
+
         metadata_uri = os.environ.get("ECS_CONTAINER_METADATA_URI_V4")
         if metadata_uri:
             try:
                 # Get task metadata which contains network info
-                task_response = requests.get(f"{metadata_uri}/task", timeout=5)
+                task_response = _SESSION.get(f"{metadata_uri}/task", timeout=5)
                 task_data = task_response.json()
 
-                # Get private IP from containers array
-                containers = task_data.get("Containers", [])
-                for container in containers:
-                    networks = container.get("Networks", [])
-                    for network in networks:
-                        ipv4_addresses = network.get("IPv4Addresses", [])
-                        if ipv4_addresses:
-                            ip = ipv4_addresses[0]
-                            logger.info(f"Discovered private IP from ECS metadata: {ip}")
-                            return ip
+                # First IPv4 address of any container network
+                ip = next(
+                    (
+                        addresses[0]
+                        for container in task_data.get("Containers", ())
+                        for network in container.get("Networks", ())
+                        if (addresses := network.get("IPv4Addresses"))
+                    ),
+                    None,
+                )
+                if ip:
+                    logger.info(f"Discovered private IP from ECS metadata: {ip}")
+                    self._private_ip = ip
+                    return ip
 
                 logger.warning("No private IP found in ECS metadata")
 
@@ -86,28 +111,13 @@ class SessionReporter:
             ip = socket.gethostbyname(hostname)
             if ip and not ip.startswith("127."):
                 logger.info(f"Discovered private IP from hostname: {ip}")
+                self._private_ip = ip
                 return ip
         except Exception as e:
             logger.warning(f"Failed to get IP from hostname: {e}")
 
         return None
 
-    def discover_public_ip(self) -> Optional[str]:
-        """
-        Discover this container's public IP (for informational purposes).
-
-        Returns:
-            Public IP address or None
-        """
-        try:
-            response = requests.get("https://api.ipify.org", timeout=10)
-            ip = response.text.strip()
-            logger.info(f"Discovered public IP: {ip}")
-            return ip
-        except Exception as e:
-            logger.warning(f"Failed to get public IP: {e}")
-            return None
-
     def discover_and_report_ip(self) -> Optional[str]:
         """
         Discover private IP and report to DynamoDB.
@@ -154,12 +164,31 @@ class SessionReporter:
             return ip  # Return IP even if DynamoDB update failed
 
     def update_activity(self) -> None:
-        """Update last activity timestamp."""
+        """Record activity, writing it at most once per ACTIVITY_WRITE_INTERVAL."""
+        self._pending_activity = int(time.time())
+        if time.monotonic() - self._last_activity_write < self.ACTIVITY_WRITE_INTERVAL:
+            return
+        self.flush_activity()
+
+    def flush_activity(self) -> None:
+        """
+        Write the latest activity timestamp now.
+
+        The write is conditional on the stored last_activity being older,
+        so a second write within the same second is rejected by DynamoDB
+        as a no-op.
+        """
+        # Lazy for the same reason as boto3 in dynamodb
+        from botocore.exceptions import ClientError
+
         try:
-            now = int(time.time())
+            now = self._pending_activity or int(time.time())
+            self._pending_activity = None
+            self._last_activity_write = time.monotonic()
             self.table.update_item(
                 Key={"session_id": self.session_id},
                 UpdateExpression="SET #last_activity = :activity, #updated_at = :updated",
+                ConditionExpression="attribute_not_exists(#last_activity) OR #last_activity < :activity",
                 ExpressionAttributeNames={
                     "#last_activity": "last_activity",
                     "#updated_at": "updated_at"
@@ -169,6 +198,10 @@ class SessionReporter:
                     ":updated": now
                 }
             )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return  # Already recorded at or after this timestamp
+            logger.warning(f"Failed to update activity: {e}")
         except Exception as e:
             logger.warning(f"Failed to update activity: {e}")
 
@@ -228,3 +261,26 @@ class SessionReporter:
             logger.info(f"Session marked as FAILED: {error}")
         except Exception as e:
             logger.exception(f"Failed to mark failed: {e}")
+
+    # Async wrappers: boto3 and the metadata lookups block, so run them in a
+    # worker thread rather than on the agent's event loop
+
+    async def discover_and_report_ip_async(self) -> Optional[str]:
+        """Async version of discover_and_report_ip()."""
+        return await asyncio.to_thread(self.discover_and_report_ip)
+
+    async def update_activity_async(self) -> None:
+        """Async version of update_activity()."""
+        await asyncio.to_thread(self.update_activity)
+
+    async def flush_activity_async(self) -> None:
+        """Async version of flush_activity()."""
+        await asyncio.to_thread(self.flush_activity)
+
+    async def mark_completed_async(self) -> None:
+        """Async version of mark_completed()."""
+        await asyncio.to_thread(self.mark_completed)
+
+    async def mark_failed_async(self, error: str = "") -> None:
+        """Async version of mark_failed()."""
+        await asyncio.to_thread(self.mark_failed, error)
@@ -7,24 +7,25 @@ Usage:
 """
 
 import argparse
-import hashlib
 import hmac
 import json
 import subprocess
 import sys
 
-import requests
+
+JIRA_SECRET_ID = "claude-cloud-agent/jira"
+
+# Process-wide aws-secretsmanager-caching cache, created on first use
+_secret_cache = None
 
 
 def get_jira_secret():
     """Get JIRA secret from AWS Secrets Manager."""
     import os
+    global _secret_cache
     # Try boto3 first, fall back to environment variable
     try:
         import boto3
-        client = boto3.client("secretsmanager")
-        response = client.get_secret_value(SecretId="claude-cloud-agent/jira")
-        return json.loads(response["SecretString"])
     except ImportError:
         # Fall back to environment variable
         secret_json = os.environ.get("JIRA_SECRET")
@@ -32,6 +33,40 @@ def get_jira_secret():
             return json.loads(secret_json)
         raise RuntimeError("boto3 not available and JIRA_SECRET env var not set")
 
+    try:
+        from aws_secretsmanager_caching import SecretCache, SecretCacheConfig
+    except ImportError:
+        # No caching library installed, fetch directly
+        client = boto3.client("secretsmanager")
+        response = client.get_secret_value(SecretId=JIRA_SECRET_ID)
+        return json.loads(response["SecretString"])
+
+    # Repeat calls in the same process are served from memory
+    if _secret_cache is None:
+        _secret_cache = SecretCache(
+            config=SecretCacheConfig(secret_refresh_interval=900),
+            client=boto3.client("secretsmanager"),
+        )
+    return json.loads(_secret_cache.get_secret_string(JIRA_SECRET_ID))
+
+
+def make_session() -> "requests.Session":
+    """Create a keep-alive session that retries gateway errors."""
+    # Imported here so --dry-run never pays for loading requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    # Retry's default allowed_methods leaves POST out, so a webhook that may
+    # already have started a session is never sent twice
+    session.mount("https://", HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    ))
+    return session
+
 
 def create_test_payload(issue_key="AGNTS-TEST", project_key="AGNTS"):
     """Create a test JIRA webhook payload for label addition."""
@@ -81,13 +116,24 @@ def create_test_payload(issue_key="AGNTS-TEST", project_key="AGNTS"):
     }
 
 
+# Serialized payload with a placeholder key; only the issue key varies
+_KEY_PLACEHOLDER = "__ISSUE_KEY__"
+_PAYLOAD_TEMPLATE = json.dumps(create_test_payload(issue_key=_KEY_PLACEHOLDER)).encode("utf-8")
+
+
+def create_test_payload_bytes(issue_key="AGNTS-TEST") -> bytes:
+    """Serialized create_test_payload(), filled in from the precomputed template."""
+    # json.dumps keeps the key correctly escaped inside the JSON string
+    return _PAYLOAD_TEMPLATE.replace(
+        _KEY_PLACEHOLDER.encode("utf-8"),
+        json.dumps(issue_key)[1:-1].encode("utf-8"),
+    )
+
+
 def sign_payload(payload_bytes: bytes, secret: str) -> str:
     """Create HMAC-SHA256 signature for the payload."""
-    sig = hmac.new(
-        secret.encode("utf-8"),
-        payload_bytes,
-        hashlib.sha256
-    ).hexdigest()
+    # One-shot C implementation, no Python-level HMAC object
+    sig = hmac.digest(secret.encode("utf-8"), payload_bytes, "sha256").hex()
     return f"sha256={sig}"
 
 
@@ -102,8 +148,7 @@ def main():
     webhook_secret = jira_secret["webhook_secret"]
 
     print(f"Creating test payload for {args.issue_key}...")
-    payload = create_test_payload(issue_key=args.issue_key)
-    payload_bytes = json.dumps(payload).encode("utf-8")
+    payload_bytes = create_test_payload_bytes(issue_key=args.issue_key)
 
     signature = sign_payload(payload_bytes, webhook_secret)
 
@@ -118,14 +163,15 @@ def main():
     print(f"\nRequest details:")
     print(f"  URL: {url}")
     print(f"  Headers: {json.dumps(headers, indent=4)}")
-    print(f"  Payload preview: {json.dumps(payload, indent=2)[:500]}...")
+    print(f"  Payload preview: {json.dumps(json.loads(payload_bytes), indent=2)[:500]}...")
 
     if args.dry_run:
         print("\n[DRY RUN] Would send webhook to Lambda")
         return
 
     print(f"\nSending webhook to {url}...")
-    response = requests.post(url, headers=headers, data=payload_bytes, timeout=30)
+    with make_session() as session:
+        response = session.post(url, headers=headers, data=payload_bytes, timeout=30)
 
     print(f"\nResponse status: {response.status_code}")
     print(f"Response body: {response.text}")
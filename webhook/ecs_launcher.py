@@ -4,14 +4,52 @@ ECS task launcher for agent containers.
 Launches Fargate tasks for new agent sessions.
 """
 
+import copy
 import logging
 import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
 
 import boto3
+from botocore.config import Config
 
 logger = logging.getLogger(__name__)
 
+# register_task_definition parameters derived from a described base task
+# definition, kept across warm Lambda invocations:
+# task definition -> (register params, time.monotonic() when described)
+TASK_DEFINITION_CACHE_TTL = 300
+_td_template_cache: dict[str, tuple[dict, float]] = {}
+
+# Revisions registered by this process, reused for the same TTL so repeat
+# launches do not add a revision each time:
+# (base task definition, image URI) -> (task definition ARN, time.monotonic())
+_revision_cache: dict[tuple[str, str], tuple[str, float]] = {}
+
+# Background pool for describing task definitions while the caller does
+# other setup (see ECSLauncher.prefetch_task_definition)
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="td-prefetch")
+
+# ECS client shared by all launchers (kept across warm Lambda invocations).
+# Adaptive retries back off client-side on throttling; the larger pool and
+# TCP keep-alive keep concurrent launches from waiting on or re-opening
+# connections
+ECS_CLIENT_CONFIG = Config(
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    max_pool_connections=50,
+    tcp_keepalive=True,
+)
+_ecs_client = None
+
+
+def get_ecs_client():
+    """Get boto3 ECS client."""
+    global _ecs_client
+    if _ecs_client is None:
+        _ecs_client = boto3.client("ecs", config=ECS_CLIENT_CONFIG)
+    return _ecs_client
+
 
 class ECSLauncher:
     """
@@ -37,14 +75,11 @@ class ECSLauncher:
             "AGENT_IMAGE_URI",
             "678954237808.dkr.ecr.us-east-1.amazonaws.com/claude-agent"
         )
-        self._ecs_client = None
 
     @property
     def ecs(self):
         """Get ECS client."""
-        if self._ecs_client is None:
-            self._ecs_client = boto3.client("ecs")
-        return self._ecs_client
+        return get_ecs_client()
 
     def launch_agent_task(
         self,
@@ -62,7 +97,8 @@ class ECSLauncher:
         jira_site: str = "",
         jira_secret_arn: str = "",
         github_secret_arn: str = "",
-        image_tag: str = "latest"
+        image_tag: str = "latest",
+        prefetched_td: Optional[Future] = None
     ) -> str:
         """
         Launch an ECS task for an agent session.
@@ -83,6 +119,7 @@ class ECSLauncher:
             jira_secret_arn: ARN for JIRA credentials secret
             github_secret_arn: ARN for GitHub App secret
             image_tag: Docker image tag (default: "latest", use "staging" for testing)
+            prefetched_td: Result of prefetch_task_definition() for the agent task definition
 
         Returns:
             Task ARN
@@ -129,16 +166,16 @@ class ECSLauncher:
         if image_tag != "latest":
             task_definition_arn = self._register_task_definition_with_image(
                 self.task_definition,
-                image_uri
+                image_uri,
+                prefetched_td
             )
         else:
             task_definition_arn = self.task_definition
 
-        logger.info(f"Launching task for session {session_id}")
-        logger.info(f"  Cluster: {self.cluster}")
-        logger.info(f"  Task Definition: {task_definition_arn}")
-        logger.info(f"  Image: {image_uri}")
-        logger.info(f"  Subnets: {self.subnets}")
+        logger.info(
+            "Launching task for session %s cluster=%s task_definition=%s image=%s subnets=%s",
+            session_id, self.cluster, task_definition_arn, image_uri, self.subnets
+        )
 
         response = self.ecs.run_task(
             cluster=self.cluster,
@@ -170,11 +207,11 @@ class ECSLauncher:
         tasks = response.get("tasks", [])
         if not tasks:
             failures = response.get("failures", [])
-            logger.error(f"Failed to launch task: {failures}")
+            logger.error("Failed to launch task: %s", failures)
             raise RuntimeError(f"Failed to launch ECS task: {failures}")
 
         task_arn = tasks[0]["taskArn"]
-        logger.info(f"Launched task {task_arn}")
+        logger.info("Launched task %s", task_arn)
 
         return task_arn
 
@@ -238,7 +275,28 @@ class ECSLauncher:
 
         return None
 
-    def _register_task_definition_with_image(self, base_task_definition: str, image_uri: str) -> str:
+    def prefetch_task_definition(self, task_definition: str) -> Future:
+        """
+        Start describing a task definition in the background.
+
+        Call this as early as possible when a launch with a non-latest image
+        tag is coming, and pass the result to the launch method as
+        prefetched_td so the describe overlaps with the caller's other setup.
+
+        Args:
+            task_definition: The task definition family or ARN
+
+        Returns:
+            Future resolving to the task definition's register parameters
+        """
+        return _prefetch_pool.submit(self._task_definition_template, task_definition)
+
+    def _register_task_definition_with_image(
+        self,
+        base_task_definition: str,
+        image_uri: str,
+        prefetched_td: Optional[Future] = None
+    ) -> str:
         """
         Register a new task definition revision with a custom image.
 
@@ -248,42 +306,72 @@ class ECSLauncher:
         Args:
             base_task_definition: The task definition family or ARN to base the new revision on
             image_uri: The full image URI including tag (e.g., repo:staging)
+            prefetched_td: Result of prefetch_task_definition() for base_task_definition
 
         Returns:
             The new task definition ARN
         """
-        # Get the current task definition
-        response = self.ecs.describe_task_definition(taskDefinition=base_task_definition)
-        task_def = response["taskDefinition"]
-
-        # Clone container definitions and update the image
-        container_defs = task_def["containerDefinitions"]
-        for container in container_defs:
+        cache_key = (base_task_definition, image_uri)
+        cached = _revision_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[1] < TASK_DEFINITION_CACHE_TTL:
+            logger.info(f"Reusing task definition {cached[0]} for image: {image_uri}")
+            return cached[0]
+
+        # Start from the base task definition and update the image
+        if prefetched_td is not None:
+            register_params = prefetched_td.result()
+        else:
+            register_params = self._task_definition_template(base_task_definition)
+        for container in register_params["containerDefinitions"]:
             container["image"] = image_uri
 
-        # Register new revision (only include fields that register_task_definition accepts)
-        register_params = {
-            "family": task_def["family"],
-            "containerDefinitions": container_defs,
-            "taskRoleArn": task_def.get("taskRoleArn"),
-            "executionRoleArn": task_def.get("executionRoleArn"),
-            "networkMode": task_def.get("networkMode"),
-            "requiresCompatibilities": task_def.get("requiresCompatibilities", []),
-            "cpu": task_def.get("cpu"),
-            "memory": task_def.get("memory"),
-        }
-
-        # Remove None values
-        register_params = {k: v for k, v in register_params.items() if v is not None}
-
         logger.info(f"Registering new task definition revision with image: {image_uri}")
         response = self.ecs.register_task_definition(**register_params)
 
         new_task_def_arn = response["taskDefinition"]["taskDefinitionArn"]
         logger.info(f"Registered new task definition: {new_task_def_arn}")
+        _revision_cache[cache_key] = (new_task_def_arn, time.monotonic())
 
         return new_task_def_arn
 
+    def _task_definition_template(self, task_definition: str) -> dict:
+        """
+        Get register_task_definition parameters for a task definition.
+
+        The task definition is described once and only the fields that
+        register_task_definition accepts are kept; the result is cached for
+        TASK_DEFINITION_CACHE_TTL seconds.
+
+        Args:
+            task_definition: The task definition family or ARN
+
+        Returns:
+            A copy of the register parameters that the caller may modify
+        """
+        cached = _td_template_cache.get(task_definition)
+        if cached is None or time.monotonic() - cached[1] >= TASK_DEFINITION_CACHE_TTL:
+            response = self.ecs.describe_task_definition(taskDefinition=task_definition)
+            task_def = response["taskDefinition"]
+
+            register_params = {
+                "family": task_def["family"],
+                "containerDefinitions": task_def["containerDefinitions"],
+                "taskRoleArn": task_def.get("taskRoleArn"),
+                "executionRoleArn": task_def.get("executionRoleArn"),
+                "networkMode": task_def.get("networkMode"),
+                "requiresCompatibilities": task_def.get("requiresCompatibilities", []),
+                "cpu": task_def.get("cpu"),
+                "memory": task_def.get("memory"),
+            }
+
+            # Remove None values
+            register_params = {k: v for k, v in register_params.items() if v is not None}
+
+            cached = (register_params, time.monotonic())
+            _td_template_cache[task_definition] = cached
+
+        return copy.deepcopy(cached[0])
+
     def launch_test_tickets_task(
         self,
         session_id: str,
@@ -291,7 +379,8 @@ class ECSLauncher:
         pr_number: int,
         repo: str,
         github_token: str = "",
-        image_tag: str = "latest"
+        image_tag: str = "latest",
+        prefetched_td: Optional[Future] = None
     ) -> str:
         """
         Launch an ECS task for test_tickets UAT environment.
@@ -306,6 +395,7 @@ class ECSLauncher:
             repo: Repository full name (owner/repo)
             github_token: GitHub token for cloning the repository
             image_tag: Docker image tag to use (default: "latest", use "staging" for testing)
+            prefetched_td: Result of prefetch_task_definition() for the test_tickets task definition
 
         Returns:
             Task ARN
@@ -339,16 +429,16 @@ class ECSLauncher:
         if image_tag != "latest":
             task_definition_arn = self._register_task_definition_with_image(
                 self.test_tickets_task_definition,
-                image_uri
+                image_uri,
+                prefetched_td
             )
         else:
             task_definition_arn = self.test_tickets_task_definition
 
-        logger.info(f"Launching test_tickets task for session {session_id}")
-        logger.info(f"  Cluster: {self.cluster}")
-        logger.info(f"  Task Definition: {task_definition_arn}")
-        logger.info(f"  Image: {image_uri}")
-        logger.info(f"  Branch: {branch}")
+        logger.info(
+            "Launching test_tickets task for session %s cluster=%s task_definition=%s image=%s branch=%s",
+            session_id, self.cluster, task_definition_arn, image_uri, branch
+        )
 
         response = self.ecs.run_task(
             cluster=self.cluster,
@@ -381,10 +471,10 @@ class ECSLauncher:
         tasks = response.get("tasks", [])
         if not tasks:
             failures = response.get("failures", [])
-            logger.error(f"Failed to launch test_tickets task: {failures}")
+            logger.error("Failed to launch test_tickets task: %s", failures)
             raise RuntimeError(f"Failed to launch test_tickets ECS task: {failures}")
 
         task_arn = tasks[0]["taskArn"]
-        logger.info(f"Launched test_tickets task {task_arn}")
+        logger.info("Launched test_tickets task %s", task_arn)
 
         return task_arn
@@ -10,9 +10,26 @@ from typing import Optional
 
 import jwt
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session (kept across warm Lambda invocations)
+_session = None
+
+
+def get_session() -> requests.Session:
+    """Get the shared GitHub API session (keep-alive connection pool)."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"
+        })
+        _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return _session
+
 
 class GitHubClient:
     """
@@ -24,6 +41,10 @@ class GitHubClient:
 
     BASE_URL = "https://api.github.com"
 
+    # Installation tokens are valid for one hour; count from when we received
+    # it, leaving margin for the request latency
+    TOKEN_LIFETIME = 3300
+
     def __init__(self, app_id: str, private_key: str, installation_id: int):
         """
         Initialize GitHub client.
@@ -37,7 +58,7 @@ class GitHubClient:
         self.private_key = private_key
         self.installation_id = installation_id
         self._installation_token: Optional[str] = None
-        self._token_expires_at: float = 0
+        self._token_expires_at: float = 0  # time.monotonic() deadline
 
     def _generate_jwt(self) -> str:
         """
@@ -60,41 +81,30 @@ class GitHubClient:
         Caches token until near expiration.
         """
         # Check if we have a valid cached token
-        if self._installation_token and time.time() < self._token_expires_at - 60:
+        if self._installation_token and time.monotonic() < self._token_expires_at - 60:
             return self._installation_token
 
         # Generate new JWT and exchange for installation token
         jwt_token = self._generate_jwt()
 
         url = f"{self.BASE_URL}/app/installations/{self.installation_id}/access_tokens"
-        headers = {
-            "Authorization": f"Bearer {jwt_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+        headers = {"Authorization": f"Bearer {jwt_token}"}
 
-        response = requests.post(url, headers=headers)
+        response = get_session().post(url, headers=headers)
         response.raise_for_status()
 
         data = response.json()
         self._installation_token = data["token"]
 
-        # Parse expiration (GitHub returns ISO 8601 format)
-        from datetime import datetime
-        expires_at = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00"))
-        self._token_expires_at = expires_at.timestamp()
+        self._token_expires_at = time.monotonic() + self.TOKEN_LIFETIME
 
         logger.info(f"Obtained new installation token, expires at {data['expires_at']}")
         return self._installation_token
 
     def _headers(self) -> dict:
-        """Get headers for API requests."""
+        """Get per-request headers (Accept/API version are set on the session)."""
         token = self._get_installation_token()
-        return {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+        return {"Authorization": f"Bearer {token}"}
 
     def get_token(self) -> str:
         """Get the current installation access token for use by other components."""
@@ -103,7 +113,7 @@ class GitHubClient:
     def _request(self, method: str, endpoint: str, **kwargs) -> dict:
         """Make an authenticated API request."""
         url = f"{self.BASE_URL}{endpoint}"
-        response = requests.request(method, url, headers=self._headers(), **kwargs)
+        response = get_session().request(method, url, headers=self._headers(), **kwargs)
         response.raise_for_status()
         return response.json() if response.content else {}
 
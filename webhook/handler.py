@@ -20,6 +20,7 @@ from github_client import GitHubClient
 from session_manager import SessionManager
 from ecs_launcher import ECSLauncher
 from jira_client import JiraClient
+from secrets_cache import get_secret, get_secrets
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -43,28 +44,9 @@ TEST_TICKETS_STAGING_LABEL = "uat-staging"  # Uses :staging image instead of :la
 TEST_TICKETS_CLAUDE_LABEL = "claude-dev"  # Auto-starts Claude to implement PR
 TEST_TICKETS_REPO = "team-mobot/test_tickets"
 
-# Lazy-loaded clients and secrets
-_secrets_client = None
-_github_app_secret = None
-_jira_secret = None
-
-
-def get_secrets_client():
-    """Get boto3 secrets manager client."""
-    global _secrets_client
-    if _secrets_client is None:
-        _secrets_client = boto3.client("secretsmanager")
-    return _secrets_client
-
-
 def get_github_app_secret() -> dict:
-    """Retrieve GitHub App secret from Secrets Manager (cached)."""
-    global _github_app_secret
-    if _github_app_secret is None:
-        client = get_secrets_client()
-        response = client.get_secret_value(SecretId=GITHUB_APP_SECRET_ARN)
-        _github_app_secret = json.loads(response["SecretString"])
-    return _github_app_secret
+    """Retrieve GitHub App secret from Secrets Manager (cached by secrets_cache)."""
+    return json.loads(get_secret(GITHUB_APP_SECRET_ARN))
 
 
 def get_webhook_secret() -> str:
@@ -83,15 +65,16 @@ def get_github_app_id() -> str:
 
 
 def get_jira_secret() -> dict:
-    """Retrieve JIRA secret from Secrets Manager (cached)."""
-    global _jira_secret
-    if _jira_secret is None:
-        if not JIRA_SECRET_ARN:
-            raise ValueError("JIRA_SECRET_ARN not configured")
-        client = get_secrets_client()
-        response = client.get_secret_value(SecretId=JIRA_SECRET_ARN)
-        _jira_secret = json.loads(response["SecretString"])
-    return _jira_secret
+    """
+    Retrieve JIRA secret from Secrets Manager (cached by secrets_cache).
+
+    JIRA sessions also need the GitHub App secret, so both are requested
+    together and fetched in one batch when neither is cached.
+    """
+    if not JIRA_SECRET_ARN:
+        raise ValueError("JIRA_SECRET_ARN not configured")
+    secrets = get_secrets([JIRA_SECRET_ARN, GITHUB_APP_SECRET_ARN])
+    return json.loads(secrets[JIRA_SECRET_ARN])
 
 
 def verify_signature(payload: bytes, signature: str) -> bool:
@@ -747,6 +730,11 @@ def handle_test_tickets_uat(
 
     logger.info(f"Starting test_tickets UAT for issue #{issue_number} in {repo_full_name} (image_tag={image_tag})")
 
+    # Describe the task definition while the session is set up
+    prefetched_td = None
+    if image_tag != "latest" and ecs.test_tickets_task_definition:
+        prefetched_td = ecs.prefetch_task_definition(ecs.test_tickets_task_definition)
+
     # Parse branch name from issue body or title
     # Look for patterns like "branch: feature/xyz" or use issue number
     branch_name = None
@@ -807,7 +795,8 @@ def handle_test_tickets_uat(
             pr_number=issue_number,
             repo=repo_full_name,
             github_token=github.get_token(),
-            image_tag=image_tag
+            image_tag=image_tag,
+            prefetched_td=prefetched_td
         )
     except Exception as e:
         logger.error(f"Failed to launch test_tickets task: {e}")
@@ -914,6 +903,11 @@ def handle_pr_labeled(
 
     logger.info(f"Starting test_tickets UAT for PR #{pr_number} branch {branch_name} (claude_dev={is_claude_dev}, image_tag={image_tag})")
 
+    # Describe the task definition while the session is set up
+    prefetched_td = None
+    if image_tag != "latest" and ecs.test_tickets_task_definition:
+        prefetched_td = ecs.prefetch_task_definition(ecs.test_tickets_task_definition)
+
     # Create session ID (sanitize branch name for subdomain)
     safe_branch = branch_name.replace("/", "-").replace("_", "-").lower()
     session_id = f"tt-{safe_branch}"[:50]  # Limit length for subdomain
@@ -974,7 +968,8 @@ Commit your work when complete and push to the remote branch."""
             pr_number=pr_number,
             repo=repo_full_name,
             github_token=github.get_token(),
-            image_tag=image_tag
+            image_tag=image_tag,
+            prefetched_td=prefetched_td
         )
     except Exception as e:
         logger.error(f"Failed to launch test_tickets task: {e}")
@@ -1267,6 +1262,11 @@ def handle_jira_issue_labeled(payload: dict, image_tag: str = "latest") -> dict:
     sessions = SessionManager(table_name=SESSIONS_TABLE)
     ecs = ECSLauncher()
 
+    # Describe the task definition while the session is set up
+    prefetched_td = None
+    if image_tag != "latest":
+        prefetched_td = ecs.prefetch_task_definition(ecs.task_definition)
+
     # Create branch name using JIRA issue key
     branch_name = f"claude/{issue_key.lower()}"
 
@@ -1411,7 +1411,8 @@ Implement the requirements described above. When complete, commit and push your
             jira_site=jira_site,
             jira_secret_arn=JIRA_SECRET_ARN,
             github_secret_arn=GITHUB_APP_SECRET_ARN,
-            image_tag=image_tag
+            image_tag=image_tag,
+            prefetched_td=prefetched_td
         )
     except Exception as e:
         logger.error(f"Failed to launch ECS task: {e}")
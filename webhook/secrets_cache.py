@@ -0,0 +1,119 @@
+"""
+Cached Secrets Manager lookups.
+
+Keeps fetched secrets across warm Lambda invocations for SECRET_TTL
+seconds. When several secrets are missing at once they are fetched with
+one BatchGetSecretValue call instead of one GetSecretValue round-trip
+each; a single secret always uses GetSecretValue.
+"""
+
+import logging
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Seconds a fetched secret is served from memory before it is re-fetched
+SECRET_TTL = 900
+
+# BatchGetSecretValue accepts at most 20 secret IDs per call
+BATCH_SIZE = 20
+
+# Lazy-loaded client and cache: secret ID -> (SecretString, time.monotonic())
+_client = None
+_cache: dict[str, tuple[str, float]] = {}
+
+
+def get_client():
+    """Get boto3 secrets manager client."""
+    global _client
+    if _client is None:
+        _client = boto3.client("secretsmanager")
+    return _client
+
+
+def _fetch_one(secret_id: str) -> str:
+    """Fetch a single secret string with GetSecretValue."""
+    response = get_client().get_secret_value(SecretId=secret_id)
+    return response["SecretString"]
+
+
+def _fetch_batch(secret_ids: list[str]) -> dict[str, str]:
+    """
+    Fetch secret strings with BatchGetSecretValue.
+
+    Returns:
+        Dict keyed by both Name and ARN of each secret returned; IDs that
+        match neither (e.g. partial ARNs) or that errored are absent
+
+    Raises:
+        ClientError: If the batch call itself fails
+    """
+    fetched = {}
+    kwargs = {"SecretIdList": secret_ids}
+    while True:
+        response = get_client().batch_get_secret_value(**kwargs)
+        for entry in response.get("SecretValues", []):
+            fetched[entry["Name"]] = entry["SecretString"]
+            fetched[entry["ARN"]] = entry["SecretString"]
+        for error in response.get("Errors", []):
+            logger.warning(f"Failed to batch fetch secret {error.get('SecretId')}: {error.get('Message')}")
+        if not response.get("NextToken"):
+            return fetched
+        kwargs["NextToken"] = response["NextToken"]
+
+
+def get_secrets(secret_ids: list[str]) -> dict[str, str]:
+    """
+    Get several secret strings, fetching any missing or expired ones.
+
+    Two or more missing secrets are fetched in batches. If the batch call
+    is denied (the role may only grant GetSecretValue) or does not return
+    a requested ID, that ID is fetched on its own with GetSecretValue.
+
+    Args:
+        secret_ids: Secret names or ARNs
+
+    Returns:
+        Dict mapping each requested ID (as passed in) to its SecretString
+
+    Raises:
+        ClientError: If a secret cannot be retrieved
+    """
+    now = time.monotonic()
+    result = {}
+    missing = []
+    for secret_id in dict.fromkeys(secret_ids):
+        cached = _cache.get(secret_id)
+        if cached is not None and now - cached[1] < SECRET_TTL:
+            result[secret_id] = cached[0]
+        else:
+            missing.append(secret_id)
+
+    fetched = {}
+    if len(missing) > 1:
+        for start in range(0, len(missing), BATCH_SIZE):
+            try:
+                fetched.update(_fetch_batch(missing[start:start + BATCH_SIZE]))
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "AccessDeniedException":
+                    raise
+                logger.warning("BatchGetSecretValue denied, fetching secrets one by one")
+                break
+
+    fetched_at = time.monotonic()
+    for secret_id in missing:
+        value = fetched.get(secret_id)
+        if value is None:
+            value = _fetch_one(secret_id)
+        _cache[secret_id] = (value, fetched_at)
+        result[secret_id] = value
+
+    return result
+
+
+def get_secret(secret_id: str) -> str:
+    """Get a single secret string through the same cache."""
+    return get_secrets([secret_id])[secret_id]
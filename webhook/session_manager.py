@@ -13,6 +13,17 @@ from boto3.dynamodb.conditions import Key
 
 logger = logging.getLogger(__name__)
 
+# DynamoDB resource shared by all managers (kept across warm Lambda invocations)
+_dynamodb = None
+
+
+def get_dynamodb():
+    """Get boto3 DynamoDB resource."""
+    global _dynamodb
+    if _dynamodb is None:
+        _dynamodb = boto3.resource("dynamodb")
+    return _dynamodb
+
 
 class SessionManager:
     """
@@ -36,15 +47,12 @@ class SessionManager:
             table_name: DynamoDB table name
         """
         self.table_name = table_name
-        self._dynamodb = None
         self._table = None
 
     @property
     def dynamodb(self):
         """Get DynamoDB resource."""
-        if self._dynamodb is None:
-            self._dynamodb = boto3.resource("dynamodb")
-        return self._dynamodb
+        return get_dynamodb()
 
     @property
     def table(self):